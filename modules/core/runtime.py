@@ -1,5 +1,6 @@
 # Copyright (c) 2026 realgarit
 import sys
+from functools import cache
 from pathlib import Path
 
 
@@ -17,6 +18,7 @@ def is_virtualenv() -> bool:
     return sys.prefix != sys.base_prefix
 
 
+@cache
 def get_base_path() -> Path:
     """
     :return: A `Path` object to the base directory of the bot (where `realbot.py` or `realbot.exe`
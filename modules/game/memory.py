@@ -339,6 +339,26 @@ def get_event_flag(flag_name: str) -> bool:
     return bool((flag_byte[0] >> (flag_offset[1])) & 1)
 
 
+def get_all_event_flags() -> dict[str, bool]:
+    """
+    Reads all event flags at once. This is a lot cheaper than calling `get_event_flag()`
+    for each flag, as the flags section of the save block only needs to be read once.
+
+    :return: A dict of all known event flag names and whether they are set.
+    """
+    if len(_event_flags) == 0:
+        return {}
+
+    first_byte = min(flag_byte for flag_byte, _ in _event_flags.values())
+    last_byte = max(flag_byte for flag_byte, _ in _event_flags.values())
+    flags_data = get_save_block(1, offset=first_byte, size=last_byte - first_byte + 1)
+
+    return {
+        flag_name: bool((flags_data[flag_byte - first_byte] >> flag_bit) & 1)
+        for flag_name, (flag_byte, flag_bit) in _event_flags.items()
+    }
+
+
 def get_event_flag_by_number(flag_number: int) -> bool:
     if context.rom.is_rs:
         offset = 0x1220
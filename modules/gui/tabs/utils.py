@@ -1,6 +1,7 @@
 # Copyright (c) 2026 realgarit
 import contextlib
 import tkinter
+from dataclasses import fields, is_dataclass
 from enum import Enum
 from tkinter import ttk
 from typing import Optional
@@ -141,9 +142,12 @@ class FancyTreeview:
                     properties = data[key].debug_dict_value()
                 else:
                     properties = {}
-                    with contextlib.suppress(AttributeError):
+                    if hasattr(data[key], "__dict__"):
                         for k in data[key].__dict__:
                             properties[k] = data[key].__dict__[k]
+                    elif is_dataclass(data[key]):
+                        for field in fields(data[key]):
+                            properties[field.name] = getattr(data[key], field.name)
                     for k in dir(data[key].__class__):
                         if isinstance(getattr(data[key].__class__, k), property):
                             properties[k] = getattr(data[key], k)
@@ -563,6 +563,16 @@ class Pokemon:
             return f"Unown ({self.unown_letter})"
         return self.name
 
+    @property
+    def species_id_for_stats(self) -> int:
+        """
+        :return: The species ID this Pokémon is logged as in the stats database. This is the
+                 species index, except for Unown where each letter has its own ID (20100+.)
+        """
+        if self.species.name == "Unown":
+            return 20100 + get_unown_index_by_letter(self.unown_letter)
+        return self.species.index
+
     def __str__(self):
         return f"{self.name} (Lv. {self.level})"
 
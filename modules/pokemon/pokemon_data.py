@@ -1,12 +1,14 @@
 # Copyright (c) 2026 realgarit
 import contextlib
 import json
-from dataclasses import dataclass
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field, fields, is_dataclass
 from enum import Enum
-from functools import cached_property
+from functools import cache, cached_property
 from typing import Literal
 
-from modules.items.items import Item, get_item_by_name, get_item_by_move_id
+from modules.items.items import Item, get_item_by_move_id
 from modules.core.runtime import get_data_path
 from modules.pokemon.pokemon_constants import DATA_DIRECTORY
 
@@ -47,7 +49,7 @@ class Type:
         return self.name
 
 
-@dataclass
+@dataclass(slots=True)
 class Move:
     """
     This represents a battle move, but not the connection to any particular Pokémon.
@@ -81,18 +83,20 @@ class Move:
 
     @classmethod
     def from_dict(cls, index: int, data: dict) -> "Move":
+        # Descriptions, effects and targets are shared between a lot of moves, so these
+        # strings are interned to avoid keeping one copy per move in memory.
         return Move(
             index=index,
             name=data["name"],
-            description=data["localised_descriptions"]["E"],
+            description=sys.intern(data["localised_descriptions"]["E"]),
             type=get_type_by_name(data["type"]),
             accuracy=float(data["accuracy"]),
             secondary_accuracy=float(data["secondary_accuracy"]),
             pp=data["pp"],
             priority=data["priority"],
             base_power=data["base_power"],
-            effect=data["effect"],
-            target=data["target"],
+            effect=sys.intern(data["effect"]),
+            target=sys.intern(data["target"]),
             makes_contact=data["makes_contact"],
             is_sound_move=data["is_sound_move"],
             affected_by_protect=data["affected_by_protect"],
@@ -100,11 +104,11 @@ class Move:
             affected_by_snatch=data["affected_by_snatch"],
             usable_with_mirror_move=data["usable_with_mirror_move"],
             affected_by_kings_rock=data["affected_by_kings_rock"],
-            tm_hm=get_item_by_name(data["tm_hm"]) if data["tm_hm"] is not None else None,
+            tm_hm=get_item_by_move_id(index),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class LearnedMove:
     """
     This represents a move slot for an individual Pokémon.
@@ -128,7 +132,7 @@ class LearnedMove:
         return f"{self.move.name} ({self.pp} / {self.total_pp})"
 
 
-@dataclass
+@dataclass(slots=True)
 class StatsValues:
     """
     A collection class for all 6 stats; can be used as a convenience thing wherever a list of
@@ -199,7 +203,7 @@ class StatsValues:
         return self.hp + self.attack + self.defence + self.speed + self.special_attack + self.special_defence
 
 
-@dataclass
+@dataclass(slots=True)
 class ContestConditions:
     """
     Represents the stats that are being used in the Pokémon Contest, equivalent to `StatsValues`.
@@ -213,7 +217,7 @@ class ContestConditions:
     feel: int
 
 
-@dataclass
+@dataclass(slots=True)
 class HeldItem:
     """
     Represents a possible held item for a Pokémon encounter, along with the probability of it
@@ -224,7 +228,7 @@ class HeldItem:
     probability: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Nature:
     """
     Represents a Pokémon nature and its stats modifiers, along with preferred and disliked Pokéblock flavors.
@@ -292,7 +296,7 @@ class Nature:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Ability:
     index: int
     name: str
@@ -314,6 +318,16 @@ class LevelUpType(Enum):
     Slow = "Slow"
 
     def get_experience_needed_for_level(self, level: int) -> int:
+        """
+        Returns how much total experience is needed to reach a given level.
+        :param level: The level to check for
+        :return: The number of EXP required to reach that level
+        """
+        if 0 <= level <= 100:
+            return _experience_needed_by_level_up_type[self][level]
+        return self._calculate_experience_needed_for_level(level)
+
+    def _calculate_experience_needed_for_level(self, level: int) -> int:
         """
         Calculates how much total experience is needed to reach a given level. The formulas here
         are taken straight from the decompliation project.
@@ -356,13 +370,17 @@ class LevelUpType(Enum):
         :param total_experience: Total number of experience points
         :return: The level a Pokémon would have with that amount of EXP
         """
-        level = 0
-        while level < 100 and total_experience >= self.get_experience_needed_for_level(level + 1):
-            level += 1
-        return level
+        return max(0, bisect_right(_experience_needed_by_level_up_type[self], total_experience) - 1)
 
 
-@dataclass
+# Total experience needed for levels 0 to 100, for each level-up type.
+_experience_needed_by_level_up_type: dict[LevelUpType, tuple[int, ...]] = {
+    level_up_type: tuple(level_up_type._calculate_experience_needed_for_level(level) for level in range(101))
+    for level_up_type in LevelUpType
+}
+
+
+@dataclass(slots=True)
 class SpeciesLevelUpMove:
     level: int
     move: Move
@@ -371,7 +389,7 @@ class SpeciesLevelUpMove:
         return f"{self.move.name} at Lv. {self.level}"
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeciesTmHmMove:
     item: Item
     move: Move
@@ -386,7 +404,7 @@ class SpeciesTmHmMove:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeciesMoveLearnset:
     level_up: list[SpeciesLevelUpMove]
     tm_hm: list[SpeciesTmHmMove]
@@ -417,7 +435,7 @@ class SpeciesMoveLearnset:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeciesEvolution:
     method: str
     method_param: int
@@ -432,7 +450,7 @@ class SpeciesEvolution:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Species:
     index: int
     national_dex_number: int
@@ -456,19 +474,27 @@ class Species:
     evolutions: list[SpeciesEvolution]
     evolves_from: int | None
     family: list[int]
+    # Bit mask of the indices of this species' types, so that `has_type()` does not
+    # have to iterate over the list of types.
+    _type_bits: int = field(init=False, repr=False, compare=False)
+    # Indices of all TM/HM items this species can learn, for `can_learn_tm_hm()`. (`Item`
+    # is not hashable, so the set contains item indices rather than the items themselves.)
+    _tm_hm_item_indices: frozenset[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._type_bits = 0
+        for species_type in self.types:
+            self._type_bits |= 1 << species_type.index
+        self._tm_hm_item_indices = frozenset(entry.item.index for entry in self.learnset.tm_hm)
 
     def has_type(self, type_to_find: Type) -> bool:
-        return any(t.index == type_to_find.index for t in self.types)
+        return bool(self._type_bits & (1 << type_to_find.index))
 
     def can_learn_tm_hm(self, tm_hm: Item | Move):
         if isinstance(tm_hm, Move):
             tm_hm = tm_hm.tm_hm
 
-        for entry in self.learnset.tm_hm:
-            if entry.item == tm_hm:
-                return True
-
-        return False
+        return tm_hm is not None and tm_hm.index in self._tm_hm_item_indices
 
     def to_dict(self) -> dict:
         return _to_dict_helper(self)
@@ -504,7 +530,7 @@ class Species:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class OriginalTrainer:
     id: int
     secret_id: int
@@ -533,66 +559,65 @@ class StatusCondition(Enum):
 
     @classmethod
     def from_bitfield(cls, bitfield: int):
-        if not bitfield:
-            return cls.Healthy
-        if bitfield & 7:
-            return cls.Sleep
-        if bitfield & (1 << 3):
-            return cls.Poison
-        if bitfield & (1 << 4):
-            return cls.Burn
-        if bitfield & (1 << 5):
-            return cls.Freeze
-        if bitfield & (1 << 6):
-            return cls.Paralysis
-        if bitfield & (1 << 7):
-            return cls.BadPoison
-        return cls.Healthy
+        # Only the lowest 8 bits contain status information.
+        return _status_conditions_by_bitfield[bitfield & 0xFF]
 
     def to_bitfield(self) -> int:
-        match self:
-            case StatusCondition.Sleep:
-                return 1
-            case StatusCondition.Poison:
-                return 1 << 3
-            case StatusCondition.Burn:
-                return 1 << 4
-            case StatusCondition.Freeze:
-                return 1 << 5
-            case StatusCondition.Paralysis:
-                return 1 << 6
-            case StatusCondition.BadPoison:
-                return 1 << 7
-            case _:
-                return 0
-
-
-@dataclass
+        return _status_condition_bits.get(self, 0)
+
+
+_status_condition_bits: dict[StatusCondition, int] = {
+    StatusCondition.Sleep: 1,
+    StatusCondition.Poison: 1 << 3,
+    StatusCondition.Burn: 1 << 4,
+    StatusCondition.Freeze: 1 << 5,
+    StatusCondition.Paralysis: 1 << 6,
+    StatusCondition.BadPoison: 1 << 7,
+}
+
+
+def _status_condition_from_bitfield(bitfield: int) -> StatusCondition:
+    if not bitfield:
+        return StatusCondition.Healthy
+    if bitfield & 7:
+        return StatusCondition.Sleep
+    if bitfield & (1 << 3):
+        return StatusCondition.Poison
+    if bitfield & (1 << 4):
+        return StatusCondition.Burn
+    if bitfield & (1 << 5):
+        return StatusCondition.Freeze
+    if bitfield & (1 << 6):
+        return StatusCondition.Paralysis
+    if bitfield & (1 << 7):
+        return StatusCondition.BadPoison
+    return StatusCondition.Healthy
+
+
+_status_conditions_by_bitfield: list[StatusCondition] = [_status_condition_from_bitfield(i) for i in range(256)]
+
+
+@dataclass(slots=True)
 class PokerusStatus:
     strain: int
     days_remaining: int
 
 
+_unown_letters: tuple[str, ...] = tuple("ABCDEFGHIJKLMNOPQRSTUVWXYZ?!")
+_unown_indices_by_letter: dict[str, int] = {letter: index for index, letter in enumerate(_unown_letters)}
+
+
 def get_unown_letter_by_index(letter_index: int) -> str:
-    if letter_index == 0:
-        return "A"
-    elif letter_index == 26:
-        return "?"
-    elif letter_index == 27:
-        return "!"
-    else:
-        return chr(ord("A") + letter_index)
+    return _unown_letters[letter_index]
 
 
 def get_unown_index_by_letter(letter: str) -> int:
-    if letter == "?":
-        return 26
-    elif letter == "!":
-        return 27
-    else:
-        return ord(letter) - ord("A")
+    return _unown_indices_by_letter[letter]
 
 
+# The data files are only parsed the first time they are needed (and then cached), so
+# that importing this module does not pay for loading all of them.
+@cache
 def _load_types() -> tuple[dict[str, Type], list[Type]]:
     by_name: dict[str, Type] = {}
     by_index: list[Type] = []
@@ -610,17 +635,15 @@ def _load_types() -> tuple[dict[str, Type], list[Type]]:
     return by_name, by_index
 
 
-_types_by_name, _types_by_index = _load_types()
-
-
 def get_type_by_name(name: str) -> Type:
-    return _types_by_name[name]
+    return _load_types()[0][name]
 
 
 def get_type_by_index(index: int) -> Type:
-    return _types_by_index[index]
+    return _load_types()[1][index]
 
 
+@cache
 def _load_moves() -> tuple[dict[str, Move], list[Move]]:
     by_name: dict[str, Move] = {}
     by_index: list[Move] = []
@@ -633,17 +656,15 @@ def _load_moves() -> tuple[dict[str, Move], list[Move]]:
     return by_name, by_index
 
 
-_moves_by_name, _moves_by_index = _load_moves()
-
-
 def get_move_by_name(name: str) -> Move:
-    return _moves_by_name[name]
+    return _load_moves()[0][name]
 
 
 def get_move_by_index(index: int) -> Move:
-    return _moves_by_index[index]
+    return _load_moves()[1][index]
 
 
+@cache
 def _load_natures() -> tuple[dict[str, Nature], list[Nature]]:
     by_name: dict[str, Nature] = {}
     by_index: list[Nature] = []
@@ -656,17 +677,15 @@ def _load_natures() -> tuple[dict[str, Nature], list[Nature]]:
     return by_name, by_index
 
 
-_natures_by_name, _natures_by_index = _load_natures()
-
-
 def get_nature_by_name(name: str) -> Nature:
-    return _natures_by_name[name]
+    return _load_natures()[0][name]
 
 
 def get_nature_by_index(index: int) -> Nature:
-    return _natures_by_index[index]
+    return _load_natures()[1][index]
 
 
+@cache
 def _load_abilities() -> tuple[dict[str, Ability], list[Ability]]:
     by_name: dict[str, Ability] = {}
     by_index: list[Ability] = []
@@ -679,52 +698,59 @@ def _load_abilities() -> tuple[dict[str, Ability], list[Ability]]:
     return by_name, by_index
 
 
-_abilities_by_name, _abilities_by_index = _load_abilities()
-
-
 def get_ability_by_name(name: str) -> Ability:
-    return _abilities_by_name[name]
+    return _load_abilities()[0][name]
 
 
 def get_ability_by_index(index: int) -> Ability:
-    return _abilities_by_index[index]
+    return _load_abilities()[1][index]
 
 
-def _load_species() -> tuple[dict[str, Species], list[Species], dict[int, Species]]:
+@cache
+def _load_species() -> tuple[dict[str, Species], dict[int, Species], dict[int, Species]]:
     by_name: dict[str, Species] = {}
-    by_index: list[Species] = []
+    by_index: dict[int, Species] = {}
     by_national_dex: dict[int, Species] = {}
     with open(get_data_path() / "species.json", "r") as file:
         species_data = json.load(file)
         for index in range(len(species_data)):
             species = Species.from_dict(index, species_data[index])
             by_name[species.name] = species
-            by_index.append(species)
+            by_index[index] = species
             by_national_dex[species.national_dex_number] = species
-    return by_name, by_index, by_national_dex
 
+    # We use species IDs 20100+ and names like 'Unown (B)' for differentiating between
+    # Unown forms, so any such ID or name should be mapped back to the Unown species.
+    unown = by_index[201]
+    for index in range(20100, 20200):
+        by_index[index] = unown
+    for letter in _unown_letters:
+        by_name[f"Unown ({letter})"] = unown
 
-_species_by_name, _species_by_index, _species_by_national_dex = _load_species()
+    return by_name, by_index, by_national_dex
 
 
 def get_species_by_name(name: str) -> Species:
-    if name.startswith("Unown ("):
-        name = "Unown"
-
-    return _species_by_name[name]
+    return _load_species()[0][name]
 
 
 def get_species_by_index(index: int) -> Species:
-    # We use species IDs 20100+ for differentiating between Unown forms, so any
-    # such ID should be mapped back to the Unown species.
-    if index >= 20100 and index < 20200:
-        index = 201
-
-    return _species_by_index[index]
+    return _load_species()[1][index]
 
 
 def get_species_by_national_dex(national_dex_number: int) -> Species:
-    return _species_by_national_dex[national_dex_number]
+    return _load_species()[2][national_dex_number]
+
+
+@cache
+def _get_public_property_names(cls: type) -> tuple[str, ...]:
+    return tuple(k for k in dir(cls) if not k.startswith("_") and isinstance(getattr(cls, k), property))
+
+
+@cache
+def _get_slotted_dataclass_attribute_names(cls: type) -> tuple[str, ...]:
+    field_names = tuple(field.name for field in fields(cls) if not field.name.startswith("_") and field.name != "data")
+    return field_names + _get_public_property_names(cls)
 
 
 def _to_dict_helper(value) -> any:
@@ -745,14 +771,17 @@ def _to_dict_helper(value) -> any:
     if isinstance(value, Enum):
         return value.name
 
+    if not hasattr(value, "__dict__") and is_dataclass(value):
+        # Slotted dataclasses cannot have any attributes other than their fields, so
+        # everything that needs to be serialised is known per class.
+        return {k: _to_dict_helper(getattr(value, k)) for k in _get_slotted_dataclass_attribute_names(type(value))}
+
     result = {}
     with contextlib.suppress(AttributeError):
         for k in value.__dict__:
             if not k.startswith("_") and k != "data":
                 result[k] = _to_dict_helper(value.__dict__[k])
-    if hasattr(value, "__class__"):
-        for k in dir(value.__class__):
-            if not k.startswith("_") and isinstance(getattr(value.__class__, k), property):
-                result[k] = _to_dict_helper(getattr(value, k))
+    for k in _get_public_property_names(type(value)):
+        result[k] = _to_dict_helper(getattr(value, k))
 
     return result
@@ -1,20 +1,27 @@
 # Copyright (c) 2026 realgarit
+import atexit
 import os
+import queue
 import sqlite3
 import sys
+import textwrap
 import threading
 import time
-from collections import deque
+from contextlib import contextmanager, suppress
 from datetime import datetime, timezone
-from textwrap import dedent
-from typing import TYPE_CHECKING, Iterable, Optional
+from functools import lru_cache
+from itertools import groupby
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+import numpy
+from rich.markup import escape
 
 from modules.battle.battle_state import BattleOutcome
 from modules.core.console import console
 from modules.core.context import context
-from modules.items.fishing import FishingAttempt, FishingResult
+from modules.items.fishing import FishingAttempt
 from modules.items.items import Item, get_item_by_index
-from modules.pokemon.pokemon import Pokemon, get_species_by_index, get_unown_letter_by_index, get_unown_index_by_letter
+from modules.pokemon.pokemon import Pokemon, get_species_by_index, get_unown_letter_by_index
 
 if TYPE_CHECKING:
     from modules.pokemon.encounter import EncounterInfo
@@ -27,12 +34,321 @@ from modules.stats.stats_models import (
     GlobalStats,
     PickupItem,
     ShinyPhase,
+    SpeciesRecord,
     StatsDatabaseSchemaTooNew,
 )
 
-current_schema_version = 3
-
-
+current_schema_version = 6
+
+# Maximum number of statements that the background writer combines into a single transaction.
+_max_writes_per_transaction = 256
+
+# How long the background writer needs to be idle before it checkpoints the WAL file.
+_seconds_idle_before_checkpoint = 10
+
+# How many times the background writer tries to commit a transaction if the database is locked
+# by another connection, before giving up.
+_write_attempts_when_busy = 3
+
+_gba_frames_per_second = 59.727500569606
+_gba_seconds_per_frame = 1 / _gba_frames_per_second
+
+# Queries that run for every encounter. The connection keeps a cache of prepared statements
+# (see `cached_statements` below), so these only get parsed by SQLite once.
+_SQL_INSERT_ENCOUNTER = """
+INSERT INTO encounters
+    (encounter_id, species_id, personality_value, shiny_phase_id, is_shiny, matching_custom_catch_filters, encounter_time, map, coordinates, bot_mode, type, outcome, data)
+VALUES
+    (?, ?, ?, ?, ? ,?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_UPDATE_SHINY_PHASE = """
+UPDATE shiny_phases
+SET encounters = ?,
+    anti_shiny_encounters = ?,
+    highest_iv_sum = ?,
+    highest_iv_sum_species = ?,
+    lowest_iv_sum = ?,
+    lowest_iv_sum_species = ?,
+    highest_sv = ?,
+    highest_sv_species = ?,
+    lowest_sv = ?,
+    lowest_sv_species = ?,
+    longest_streak = ?,
+    longest_streak_species = ?,
+    current_streak = ?,
+    current_streak_species = ?,
+    fishing_attempts = ?,
+    successful_fishing_attempts = ?,
+    longest_unsuccessful_fishing_streak = ?,
+    current_unsuccessful_fishing_streak = ?,
+    pokenav_calls = ?,
+    snapshot_total_encounters = ?,
+    snapshot_total_shiny_encounters = ?,
+    snapshot_species_encounters = ?,
+    snapshot_species_shiny_encounters = ?
+WHERE shiny_phase_id = ?
+"""
+
+_SQL_UPDATE_ENCOUNTER_OUTCOME = "UPDATE encounters SET outcome = ? WHERE encounter_id = ?"
+
+_SQL_INSERT_SHINY_PHASE = "INSERT INTO shiny_phases (shiny_phase_id, start_time) VALUES (?, ?)"
+
+_SQL_END_SHINY_PHASE = "UPDATE shiny_phases SET end_time = ?, shiny_encounter_id = ? WHERE shiny_phase_id = ?"
+
+_SQL_REPLACE_PICKUP_ITEM = "REPLACE INTO pickup_items (item_id, item_name, times_picked_up) VALUES (?, ?, ?)"
+
+_SQL_REPLACE_BASE_DATA = "REPLACE INTO base_data (data_key, value) VALUES (?, ?)"
+
+_SQL_UPSERT_ENCOUNTER_SUMMARY = """
+INSERT INTO encounter_summaries
+    (species_id, species_name, total_encounters, shiny_encounters, catches, total_highest_iv_sum, total_lowest_iv_sum, total_highest_sv, total_lowest_sv, phase_encounters, phase_highest_iv_sum, phase_lowest_iv_sum, phase_highest_sv, phase_lowest_sv, last_encounter_time)
+VALUES
+    (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (species_id) DO UPDATE
+SET species_name = excluded.species_name,
+    total_encounters = excluded.total_encounters,
+    shiny_encounters = excluded.shiny_encounters,
+    catches = excluded.catches,
+    total_highest_iv_sum = excluded.total_highest_iv_sum,
+    total_lowest_iv_sum = excluded.total_lowest_iv_sum,
+    total_highest_sv = excluded.total_highest_sv,
+    total_lowest_sv = excluded.total_lowest_sv,
+    phase_encounters = excluded.phase_encounters,
+    phase_highest_iv_sum = excluded.phase_highest_iv_sum,
+    phase_lowest_iv_sum = excluded.phase_lowest_iv_sum,
+    phase_highest_sv = excluded.phase_highest_sv,
+    phase_lowest_sv = excluded.phase_lowest_sv,
+    last_encounter_time = excluded.last_encounter_time
+"""
+
+_SQL_SELECT_ENCOUNTERS = """
+SELECT
+    encounter_id,
+    species_id,
+    personality_value,
+    shiny_phase_id,
+    is_shiny,
+    is_roamer,
+    matching_custom_catch_filters,
+    encounter_time,
+    map,
+    coordinates,
+    bot_mode,
+    type,
+    outcome,
+    data
+FROM encounters
+"""
+
+_SQL_SELECT_SHINY_PHASES = """
+SELECT
+    shiny_phases.shiny_phase_id,
+    shiny_phases.start_time,
+    shiny_phases.end_time,
+    shiny_phases.shiny_encounter_id,
+    shiny_phases.encounters,
+    shiny_phases.anti_shiny_encounters,
+    shiny_phases.highest_iv_sum,
+    shiny_phases.highest_iv_sum_species,
+    shiny_phases.lowest_iv_sum,
+    shiny_phases.lowest_iv_sum_species,
+    shiny_phases.highest_sv,
+    shiny_phases.highest_sv_species,
+    shiny_phases.lowest_sv,
+    shiny_phases.lowest_sv_species,
+    shiny_phases.longest_streak,
+    shiny_phases.longest_streak_species,
+    shiny_phases.current_streak,
+    shiny_phases.current_streak_species,
+    shiny_phases.fishing_attempts,
+    shiny_phases.successful_fishing_attempts,
+    shiny_phases.longest_unsuccessful_fishing_streak,
+    shiny_phases.current_unsuccessful_fishing_streak,
+    shiny_phases.pokenav_calls,
+    shiny_phases.snapshot_total_encounters,
+    shiny_phases.snapshot_total_shiny_encounters,
+    shiny_phases.snapshot_species_encounters,
+    shiny_phases.snapshot_species_shiny_encounters,
+
+    encounters.encounter_id,
+    encounters.species_id,
+    encounters.personality_value,
+    encounters.shiny_phase_id,
+    encounters.is_shiny,
+    encounters.is_roamer,
+    encounters.matching_custom_catch_filters,
+    encounters.encounter_time,
+    encounters.map,
+    encounters.coordinates,
+    encounters.bot_mode,
+    encounters.type,
+    encounters.outcome,
+    encounters.data
+FROM shiny_phases
+LEFT JOIN encounters ON encounters.encounter_id = shiny_phases.shiny_encounter_id
+"""
+
+
+# SQL scripts that `StatsDatabase._update_schema()` runs to bring the database from a given schema
+# version (the number in the name) to the next one.
+_SCHEMA_V0_SCRIPT = """
+CREATE TABLE schema_version (version INT UNSIGNED);
+
+CREATE TABLE base_data (
+    data_key INT UNSIGNED PRIMARY KEY,
+    value TEXT DEFAULT NULL
+);
+
+CREATE TABLE encounter_summaries (
+    species_id INT UNSIGNED PRIMARY KEY,
+    species_name TEXT NOT NULL,
+    total_encounters INT UNSIGNED,
+    shiny_encounters INT UNSIGNED,
+    catches INT UNSIGNED,
+    total_highest_iv_sum INT UNSIGNED,
+    total_lowest_iv_sum INT UNSIGNED,
+    total_highest_sv INT UNSIGNED,
+    total_lowest_sv INT UNSIGNED,
+    phase_encounters INT UNSIGNED,
+    phase_highest_iv_sum INT UNSIGNED DEFAULT NULL,
+    phase_lowest_iv_sum INT UNSIGNED DEFAULT NULL,
+    phase_highest_sv INT UNSIGNED DEFAULT NULL,
+    phase_lowest_sv INT UNSIGNED DEFAULT NULL,
+    last_encounter_time DATETIME
+);
+
+CREATE TABLE shiny_phases (
+    shiny_phase_id INT UNSIGNED PRIMARY KEY,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME DEFAULT NULL,
+    shiny_encounter_id INT UNSIGNED DEFAULT NULL,
+    encounters INT UNSIGNED DEFAULT 0,
+    highest_iv_sum INT UNSIGNED DEFAULT NULL,
+    highest_iv_sum_species INT UNSIGNED DEFAULT NULL,
+    lowest_iv_sum INT UNSIGNED DEFAULT NULL,
+    lowest_iv_sum_species INT UNSIGNED DEFAULT NULL,
+    highest_sv INT UNSIGNED DEFAULT NULL,
+    highest_sv_species INT UNSIGNED DEFAULT NULL,
+    lowest_sv INT UNSIGNED DEFAULT NULL,
+    lowest_sv_species INT UNSIGNED DEFAULT NULL,
+    longest_streak INT UNSIGNED DEFAULT 0,
+    longest_streak_species INT UNSIGNED DEFAULT NULL,
+    current_streak INT UNSIGNED DEFAULT 0,
+    current_streak_species INT UNSIGNED DEFAULT NULL,
+    fishing_attempts INT UNSIGNED DEFAULT 0,
+    successful_fishing_attempts INT UNSIGNED DEFAULT 0,
+    longest_unsuccessful_fishing_streak INT UNSIGNED DEFAULT 0,
+    current_unsuccessful_fishing_streak INT UNSIGNED DEFAULT 0,
+    snapshot_total_encounters INT UNSIGNED DEFAULT NULL,
+    snapshot_total_shiny_encounters INT UNSIGNED DEFAULT NULL,
+    snapshot_species_encounters INT UNSIGNED DEFAULT NULL,
+    snapshot_species_shiny_encounters INT UNSIGNED DEFAULT NULL
+);
+
+CREATE TABLE encounters (
+    encounter_id INT UNSIGNED PRIMARY KEY,
+    species_id INT UNSIGNED NOT NULL,
+    personality_value INT UNSIGNED NOT NULL,
+    shiny_phase_id INT UNSIGNED NOT NULL,
+    is_shiny INT UNSIGNED DEFAULT 0,
+    is_roamer INT UNSIGNED DEFAULT 0,
+    matching_custom_catch_filters TEXT DEFAULT NULL,
+    encounter_time DATETIME NOT NULL,
+    map TEXT,
+    coordinates TEXT,
+    bot_mode TEXT,
+    type TEXT DEFAULT NULL,
+    outcome INT UNSIGNED DEFAULT NULL,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE pickup_items (
+    item_id INT UNSIGNED PRIMARY KEY,
+    item_name TEXT NOT NULL,
+    times_picked_up INT NOT NULL DEFAULT 0
+);
+"""
+
+_SCHEMA_V1_SCRIPT = """
+ALTER TABLE shiny_phases
+    ADD pokenav_calls INT UNSIGNED DEFAULT 0;
+
+DROP TABLE base_data;
+
+CREATE TABLE base_data (
+    data_key TEXT PRIMARY KEY,
+    value TEXT DEFAULT NULL
+);
+"""
+
+_SCHEMA_V2_SCRIPT = """
+ALTER TABLE shiny_phases
+    ADD anti_shiny_encounters INT UNSIGNED DEFAULT 0;
+"""
+
+_SCHEMA_V3_SCRIPT = """
+CREATE INDEX IF NOT EXISTS ix_shiny_phases_completed_encounters
+    ON shiny_phases (encounters)
+    WHERE end_time IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_shiny_phases_current
+    ON shiny_phases (shiny_phase_id)
+    WHERE end_time IS NULL;
+"""
+
+_SCHEMA_V4_SCRIPT = """
+CREATE INDEX IF NOT EXISTS ix_encounters_personality_value
+    ON encounters (personality_value);
+"""
+
+
+def _configure_connection(connection: sqlite3.Connection) -> None:
+    """
+    Applies the per-connection settings that are used for both the writing and the reading
+    connections to the stats database.
+
+    The busy timeout does not need to be set here, as `sqlite3.connect()` already defaults
+    to waiting 5 seconds for a lock.
+
+    :param connection: Newly opened connection to `stats.db`.
+    """
+    connection.execute("PRAGMA temp_store=MEMORY")
+    connection.execute("PRAGMA cache_size=-65536")
+    connection.execute("PRAGMA mmap_size=1073741824")
+
+
+def _species_record_values(record: SpeciesRecord | None) -> tuple[int | None, int | None]:
+    """
+    :param record: A species record of a shiny phase, or None if there is none yet.
+    :return: Tuple of the record's value and its species ID, as stored in the database.
+    """
+    if record is None:
+        return None, None
+    return record.value, record.species_id_for_database
+
+
+@lru_cache(maxsize=128)
+def _build_select_query(select_query: str, where_clause: str | None, order_clause: str, with_limit: bool) -> str:
+    """
+    Assembles a SELECT query out of its parts. The limit and offset are left as parameters
+    (`LIMIT ? OFFSET ?`), so that there is only one query string per `where_clause` and the
+    connection's statement cache can be used.
+
+    :param select_query: The `SELECT ... FROM ...` part of the query.
+    :param where_clause: Optional condition (and, for shiny phases, ordering.)
+    :param order_clause: Optional `ORDER BY ...` clause.
+    :param with_limit: Whether to add the placeholders for limit and offset.
+    :return: The SQL query.
+    """
+    query = select_query
+    if where_clause is not None:
+        query += f"WHERE {where_clause}\n"
+    if order_clause:
+        query += f"{order_clause}\n"
+    if with_limit:
+        query += "LIMIT ? OFFSET ?\n"
+    return query
 
 
 class StatsDatabase:
@@ -40,9 +356,56 @@ class StatsDatabase:
         self.encounter_rate: int = 0
         self.encounter_rate_at_1x: float = 0.0
 
-        self._connection = sqlite3.connect(profile.path / "stats.db", check_same_thread=False)
+        self._connection = sqlite3.connect(profile.path / "stats.db", check_same_thread=False, cached_statements=256)
         self._cursor = self._connection.cursor()
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._transaction_depth: int = 0
+        self._pending_shiny_phase_update: ShinyPhase | None = None
+        self._pending_encounter_summary_updates: dict[int, EncounterSummary] = {}
+
+        # Counts changes to the stats, see `get_global_stats()`.
+        self._stats_version: int = 0
+        self._global_stats: tuple[int, GlobalStats] | None = None
+
+        # Once the database has been set up, writes are not executed right away. Instead, they are
+        # collected in `_pending_writes` until the next commit, and then handed over to a background
+        # thread (see `_write_loop()`) so that the bot does not have to wait for the disk.
+        # Each entry is a tuple of `(query, parameters, is_executemany)`.
+        self._pending_writes: list[tuple[str, list | tuple, bool]] = []
+        # Each commit gets a number, so that readers can wait for a particular commit to have been
+        # written (see `_wait_for_pending_writes()`) rather than for the whole queue to be empty.
+        # `close()` puts `None` into the queue after the last commit, to stop the writer thread.
+        self._write_queue: queue.Queue[tuple[int, list[tuple[str, list | tuple, bool]]] | None] = queue.Queue()
+        self._number_of_commits_queued: int = 0
+        self._number_of_commits_written: int = 0
+        self._write_progress = threading.Condition()
+        self._last_commit_of_thread = threading.local()
+        # If writing fails in a way that means the bot cannot continue (such as another process
+        # holding the database), the error is kept here until the bot's thread handles it (see
+        # `_handle_write_error()`.)
+        # This has its own lock because the bot's thread might hold `_lock` while it waits for the writer.
+        self._write_error: sqlite3.OperationalError | sqlite3.IntegrityError | None = None
+        self._write_error_lock = threading.Lock()
+        self._writer_thread: threading.Thread | None = None
+
+        # Write-ahead logging means that a commit only needs to append to the WAL file rather
+        # than rewriting the rollback journal, and that reads are not blocked by writes. With
+        # WAL, `synchronous=NORMAL` is still safe against database corruption (but a power loss
+        # might lose the last few commits, which is fine for stats.)
+        # The journal mode is stored in the database file, so it only needs to be changed once.
+        if self._cursor.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            self._cursor.execute("PRAGMA journal_mode=WAL")
+        self._cursor.execute("PRAGMA synchronous=NORMAL")
+        # Once the WAL file has grown past 1,000 pages, the commit that noticed copies it back into
+        # the database. Those commits happen on the background writer thread (see `_write_loop()`.)
+        self._cursor.execute("PRAGMA wal_autocheckpoint=1000")
+        _configure_connection(self._connection)
+
+        # Reads go through separate, read-only connections (one per thread, see `_read_cursor()`),
+        # so that querying the encounter log from the web server does not have to wait for the
+        # writing connection or other readers. They are only used once the schema is up-to-date.
+        self._read_connection_uri: str | None = None
+        self._read_connections = threading.local()
 
         db_schema_version = self._get_schema_version()
         if db_schema_version < current_schema_version:
@@ -54,6 +417,10 @@ class StatsDatabase:
                 f"The profile's stats database schema has version {db_schema_version}, but this version of the bot only supports version {current_schema_version}. Cannot load stats."
             )
 
+        self._read_connection_uri = f"{(profile.path / 'stats.db').resolve().as_uri()}?mode=ro"
+        self._writer_thread = threading.Thread(target=self._write_loop, name="Stats Database Writer", daemon=True)
+        self._writer_thread.start()
+
         self.last_encounter: Encounter | None = self._get_last_encounter()
         self.last_fishing_attempt: Optional[FishingAttempt] = None
         self.last_shiny_species_phase_encounters: int | None = None
@@ -77,62 +444,64 @@ class StatsDatabase:
         # variable `REALBOT_ENCOUNTER_BENCHMARK` to anything but an empty string in order to
         # increase the sample size to 1,000.
         encounter_buffer_size = 1000 if os.getenv("REALBOT_ENCOUNTER_BENCHMARK", "") != "" else 100
-        self._encounter_timestamps: deque[float] = deque(maxlen=encounter_buffer_size)
-        self._encounter_frames: deque[int] = deque(maxlen=encounter_buffer_size)
+        # These are ring buffers, `_encounter_buffer_position` is the index that the next entry
+        # will be written to.
+        self._encounter_timestamps: numpy.ndarray = numpy.zeros(encounter_buffer_size, dtype=numpy.float64)
+        self._encounter_frames: numpy.ndarray = numpy.zeros(encounter_buffer_size, dtype=numpy.int64)
+        self._encounter_buffer_position: int = 0
+        self._encounter_buffer_count: int = 0
+
+        atexit.register(self.close)
 
     def set_data(self, key: str, value: str | None):
-        self._execute_write("REPLACE INTO base_data (data_key, value) VALUES (?, ?)", (key, value))
+        self._execute_write(_SQL_REPLACE_BASE_DATA, (key, value))
         self._base_data[key] = value
         self._commit()
 
     def get_data(self, key: str) -> str | None:
-        return self._base_data[key] if key in self._base_data else None
+        return self._base_data.get(key)
 
     def log_encounter(self, encounter_info: "EncounterInfo") -> Encounter:
         encounter_time_in_utc = encounter_info.encounter_time.replace(tzinfo=timezone.utc)
 
         self._update_encounter_rates()
 
-        if self.current_shiny_phase is None:
-            shiny_phase_id = self._get_next_shiny_phase_id()
-            self.current_shiny_phase = ShinyPhase.create(shiny_phase_id, encounter_time_in_utc)
-            self._insert_shiny_phase(self.current_shiny_phase)
-
-        encounter = Encounter(
-            encounter_id=self._next_encounter_id,
-            shiny_phase_id=self.current_shiny_phase.shiny_phase_id,
-            matching_custom_catch_filters=encounter_info.catch_filters_result,
-            encounter_time=encounter_time_in_utc,
-            map=encounter_info.map.name,
-            coordinates=f"{encounter_info.coordinates[0]}:{encounter_info.coordinates[1]}",
-            bot_mode=encounter_info.bot_mode,
-            type=encounter_info.type,
-            outcome=None,
-            pokemon=encounter_info.pokemon,
-        )
-
-        self.last_encounter = encounter
-        if context.config.logging.log_encounters or encounter_info.is_of_interest:
-            self._insert_encounter(encounter)
-        self.current_shiny_phase.update(encounter)
-        self._update_shiny_phase(self.current_shiny_phase)
+        with self._transaction():
+            if self.current_shiny_phase is None:
+                shiny_phase_id = self._get_next_shiny_phase_id()
+                self.current_shiny_phase = ShinyPhase.create(shiny_phase_id, encounter_time_in_utc)
+                self._insert_shiny_phase(self.current_shiny_phase)
+
+            encounter = Encounter(
+                encounter_id=self._next_encounter_id,
+                shiny_phase_id=self.current_shiny_phase.shiny_phase_id,
+                matching_custom_catch_filters=encounter_info.catch_filters_result,
+                encounter_time=encounter_time_in_utc,
+                map=encounter_info.map.name,
+                coordinates=f"{encounter_info.coordinates[0]}:{encounter_info.coordinates[1]}",
+                bot_mode=encounter_info.bot_mode,
+                type=encounter_info.type,
+                outcome=None,
+                pokemon=encounter_info.pokemon,
+            )
 
-        if encounter.pokemon.species.name == "Unown":
-            species_index = 20100 + get_unown_index_by_letter(encounter.pokemon.unown_letter)
-        else:
-            species_index = encounter.pokemon.species.index
+            self.last_encounter = encounter
+            if context.config.logging.log_encounters or encounter_info.is_of_interest:
+                self._insert_encounter(encounter)
+            self.current_shiny_phase.update(encounter)
+            self._queue_shiny_phase_update(self.current_shiny_phase)
 
-        if species_index not in self._encounter_summaries:
-            self._encounter_summaries[species_index] = EncounterSummary.create(encounter)
-        else:
-            self._encounter_summaries[species_index].update(encounter)
+            species_index = encounter.pokemon.species_id_for_stats
+            if species_index not in self._encounter_summaries:
+                self._encounter_summaries[species_index] = EncounterSummary.create(encounter)
+            else:
+                self._encounter_summaries[species_index].update(encounter)
 
-        self._insert_or_update_encounter_summary(self._encounter_summaries[species_index])
-        self._commit()
-        self._next_encounter_id += 1
+            self._queue_encounter_summary_update(self._encounter_summaries[species_index])
+            self._next_encounter_id += 1
 
-        if encounter_info.battle_outcome is not None:
-            self.log_end_of_battle(encounter_info.battle_outcome, encounter_info)
+            if encounter_info.battle_outcome is not None:
+                self.log_end_of_battle(encounter_info.battle_outcome, encounter_info)
 
         return encounter
 
@@ -149,51 +518,50 @@ class StatsDatabase:
         if self.current_shiny_phase is None:
             return
 
-        self.current_shiny_phase.start_time = datetime.now(timezone.utc)
-        self.current_shiny_phase.shiny_encounter = 0
-        self.current_shiny_phase.encounters = 0
-        self.current_shiny_phase.highest_iv_sum = None
-        self.current_shiny_phase.lowest_iv_sum = None
-        self.current_shiny_phase.highest_sv = None
-        self.current_shiny_phase.lowest_sv = None
-        self.current_shiny_phase.longest_streak = None
-        self.current_shiny_phase.current_streak = None
-        self.current_shiny_phase.fishing_attempts = 0
-        self.current_shiny_phase.successful_fishing_attempts = 0
-        self.current_shiny_phase.longest_unsuccessful_fishing_streak = 0
-        self.current_shiny_phase.current_unsuccessful_fishing_streak = 0
-        self.current_shiny_phase.pokenav_calls = 0
-        self._update_shiny_phase(self.current_shiny_phase)
+        with self._transaction():
+            self.current_shiny_phase.start_time = datetime.now(timezone.utc)
+            self.current_shiny_phase.shiny_encounter = 0
+            self.current_shiny_phase.encounters = 0
+            self.current_shiny_phase.highest_iv_sum = None
+            self.current_shiny_phase.lowest_iv_sum = None
+            self.current_shiny_phase.highest_sv = None
+            self.current_shiny_phase.lowest_sv = None
+            self.current_shiny_phase.longest_streak = None
+            self.current_shiny_phase.current_streak = None
+            self.current_shiny_phase.fishing_attempts = 0
+            self.current_shiny_phase.successful_fishing_attempts = 0
+            self.current_shiny_phase.longest_unsuccessful_fishing_streak = 0
+            self.current_shiny_phase.current_unsuccessful_fishing_streak = 0
+            self.current_shiny_phase.pokenav_calls = 0
+            self._queue_shiny_phase_update(self.current_shiny_phase)
 
-        self._execute_write(
-            """
-            UPDATE shiny_phases
-            SET start_time = ?
-            WHERE shiny_phase_id = ?
-            """,
-            (self.current_shiny_phase.start_time, self.current_shiny_phase.shiny_phase_id),
-        )
-
-        self._execute_write(
-            """
-            UPDATE encounter_summaries
-            SET phase_encounters = 0,
-                phase_highest_iv_sum = NULL,
-                phase_lowest_iv_sum = NULL,
-                phase_highest_sv = NULL,
-                phase_lowest_sv = NULL
-            """
-        )
+            self._execute_write(
+                """
+                UPDATE shiny_phases
+                SET start_time = ?
+                WHERE shiny_phase_id = ?
+                """,
+                (self.current_shiny_phase.start_time, self.current_shiny_phase.shiny_phase_id),
+            )
 
-        for index in self._encounter_summaries:
-            summary = self._encounter_summaries[index]
-            summary.phase_encounters = 0
-            summary.phase_highest_iv_sum = None
-            summary.phase_lowest_iv_sum = None
-            summary.phase_highest_sv = None
-            summary.phase_lowest_sv = None
+            self._execute_write(
+                """
+                UPDATE encounter_summaries
+                SET phase_encounters = 0,
+                    phase_highest_iv_sum = NULL,
+                    phase_lowest_iv_sum = NULL,
+                    phase_highest_sv = NULL,
+                    phase_lowest_sv = NULL
+                """
+            )
 
-        self._commit()
+            for index in self._encounter_summaries:
+                summary = self._encounter_summaries[index]
+                summary.phase_encounters = 0
+                summary.phase_highest_iv_sum = None
+                summary.phase_lowest_iv_sum = None
+                summary.phase_highest_sv = None
+                summary.phase_lowest_sv = None
 
     def reset_shiny_phase(self, encounter: Encounter):
         """
@@ -217,11 +585,12 @@ class StatsDatabase:
         ):
             self._longest_shiny_phase = self.current_shiny_phase
         self.current_shiny_phase = None
-        for species_id in self._encounter_summaries:
-            if self._encounter_summaries[species_id].is_same_species(encounter.pokemon):
-                self.last_shiny_species_phase_encounters = self._encounter_summaries[species_id].phase_encounters
 
-            encounter_summary = self._encounter_summaries[species_id]
+        species_index = encounter.pokemon.species_id_for_stats
+        if species_index in self._encounter_summaries:
+            self.last_shiny_species_phase_encounters = self._encounter_summaries[species_index].phase_encounters
+
+        for encounter_summary in self._encounter_summaries.values():
             encounter_summary.phase_encounters = 0
             encounter_summary.phase_highest_iv_sum = None
             encounter_summary.phase_lowest_iv_sum = None
@@ -234,9 +603,10 @@ class StatsDatabase:
         if self.last_encounter is not None:
             self.last_encounter.outcome = battle_outcome
             self._update_encounter_outcome(self.last_encounter)
-            if self.last_encounter.species_id in self._encounter_summaries and encounter_info.is_of_interest:
-                self._encounter_summaries[self.last_encounter.species_id].update_outcome(battle_outcome)
-                self._insert_or_update_encounter_summary(self._encounter_summaries[self.last_encounter.species_id])
+            species_index = self.last_encounter.pokemon.species_id_for_stats
+            if species_index in self._encounter_summaries and encounter_info.is_of_interest:
+                self._encounter_summaries[species_index].update_outcome(battle_outcome)
+                self._queue_encounter_summary_update(self._encounter_summaries[species_index])
             self._commit()
 
     def log_pickup_items(self, picked_up_items: list["Item"]) -> None:
@@ -246,33 +616,39 @@ class StatsDatabase:
                 self._pickup_items[item.index] = PickupItem(item)
             self._pickup_items[item.index].times_picked_up += 1
             need_updating.add(item.index)
-        for item_index in need_updating:
-            self._insert_or_update_pickup_item(self._pickup_items[item_index])
-            self._commit()
+        with self._transaction():
+            self._insert_or_update_pickup_items([self._pickup_items[item_index] for item_index in need_updating])
 
     def log_fishing_attempt(self, attempt: FishingAttempt):
         self.last_fishing_attempt = attempt
         if self.current_shiny_phase is not None:
             self.current_shiny_phase.update_fishing_attempt(attempt)
-            if attempt.result is not FishingResult.Encounter:
-                self._update_shiny_phase(self.current_shiny_phase)
-                self._commit()
+            self._queue_shiny_phase_update(self.current_shiny_phase)
+            self._commit()
         context.message = f"Fishing attempt with {attempt.rod.name} and result {attempt.result.name}"
 
     def log_pokenav_call(self):
         if self.current_shiny_phase is not None:
             self.current_shiny_phase.pokenav_calls += 1
-            self._update_shiny_phase(self.current_shiny_phase)
+            self._queue_shiny_phase_update(self.current_shiny_phase)
             self._commit()
 
     def get_global_stats(self) -> GlobalStats:
-        return GlobalStats(
+        # The same `GlobalStats` instance is handed out until the stats change, so that its totals
+        # and its `to_dict()` output only need to be worked out once per change.
+        stats_version = self._stats_version
+        if self._global_stats is not None and self._global_stats[0] == stats_version:
+            return self._global_stats[1]
+
+        global_stats = GlobalStats(
             self._encounter_summaries,
             self._pickup_items,
             self.current_shiny_phase,
             self._longest_shiny_phase,
             self._shortest_shiny_phase,
         )
+        self._global_stats = (stats_version, global_stats)
+        return global_stats
 
     def get_encounter_log(self) -> list[Encounter]:
         return list(self.query_encounters())
@@ -293,74 +669,52 @@ class StatsDatabase:
         limit: int | None = 10,
         offset: int = 0,
     ) -> Iterable[Encounter]:
-        result = self._cursor.execute(
-            f"""
-            SELECT
-                encounter_id,
-                species_id,
-                personality_value,
-                shiny_phase_id,
-                is_shiny,
-                is_roamer,
-                matching_custom_catch_filters,
-                encounter_time,
-                map,
-                coordinates,
-                bot_mode,
-                type,
-                outcome,
-                data
-            FROM encounters
-            {f'WHERE {where_clause}' if where_clause is not None else ''}
-            ORDER BY encounter_id DESC
-            {f'LIMIT {limit} OFFSET {offset}' if limit is not None else ''}
-            """,
-            [] if parameters is None else parameters,
+        query = _build_select_query(
+            _SQL_SELECT_ENCOUNTERS, where_clause, "ORDER BY encounter_id DESC", with_limit=limit is not None
         )
+        parameters = [] if parameters is None else list(parameters)
+        if limit is not None:
+            parameters.extend((limit, offset))
+
+        result = self._read_cursor().execute(query, parameters)
         for row in result:
             yield Encounter.from_row_data(row)
 
     def count_encounters(self, where_clause: str | None = None, parameters: tuple | list | None = None) -> int:
-        result = self._cursor.execute(
-            f"""
-            SELECT COUNT(*)
-            FROM encounters
-            {f'WHERE {where_clause}' if where_clause is not None else ''}
-            """,
-            [] if parameters is None else parameters,
-        )
+        query = _build_select_query("SELECT COUNT(*) FROM encounters\n", where_clause, "", False)
+        result = self._read_cursor().execute(query, [] if parameters is None else parameters)
 
         return int(result.fetchone()[0])
 
     def _update_encounter_rates(self) -> None:
-        self._encounter_timestamps.append(time.time())
-        self._encounter_frames.append(context.frame)
-
-        number_of_encounters = len(self._encounter_timestamps)
+        buffer_size = len(self._encounter_timestamps)
+        position = self._encounter_buffer_position
+        self._encounter_timestamps[position] = time.time()
+        self._encounter_frames[position] = context.frame
+        self._encounter_buffer_position = (position + 1) % buffer_size
+        self._encounter_buffer_count = min(self._encounter_buffer_count + 1, buffer_size)
+
+        number_of_encounters = self._encounter_buffer_count
         if number_of_encounters > 1:
-            first_recorded_timestamp = self._encounter_timestamps[0]
-            last_recorded_timestamp = self._encounter_timestamps[-1]
-            timestamp_diff = last_recorded_timestamp - first_recorded_timestamp
+            first_position = (position + 1 - number_of_encounters) % buffer_size
+
+            timestamp_diff = float(self._encounter_timestamps[position] - self._encounter_timestamps[first_position])
             average_time_per_encounter = timestamp_diff / (number_of_encounters - 1)
             if average_time_per_encounter > 0:
                 self.encounter_rate = int(3600 / average_time_per_encounter)
             else:
                 self.encounter_rate = 0
 
-        number_of_encounters = len(self._encounter_frames)
-        if number_of_encounters > 1:
-            first_recorded_frame = self._encounter_frames[0]
-            last_recorded_frame = self._encounter_frames[-1]
-            frame_diff = last_recorded_frame - first_recorded_frame
+            frame_diff = int(self._encounter_frames[position] - self._encounter_frames[first_position])
             average_frames_per_encounter = frame_diff / (number_of_encounters - 1)
-            average_seconds_per_encounter = average_frames_per_encounter / 59.727500569606
+            average_seconds_per_encounter = average_frames_per_encounter * _gba_seconds_per_frame
             if average_seconds_per_encounter > 0:
                 self.encounter_rate_at_1x = round(3600 / average_seconds_per_encounter, 1)
             else:
                 self.encounter_rate_at_1x = 0
 
     def _get_next_encounter_id(self) -> int:
-        result = self._cursor.execute(
+        result = self._read_cursor().execute(
             "SELECT encounter_id FROM encounters ORDER BY encounter_id DESC LIMIT 1"
         ).fetchone()
         if result is None:
@@ -375,66 +729,37 @@ class StatsDatabase:
         return self._query_single_shiny_phase("shiny_phases.shiny_phase_id = ?", (shiny_phase_id,))
 
     def _get_shortest_shiny_phase(self) -> ShinyPhase | None:
-        return self._query_single_shiny_phase("end_time IS NOT NULL ORDER BY encounters ASC")
+        return self._get_shiny_phase_by_id_query(
+            "SELECT shiny_phase_id FROM shiny_phases WHERE end_time IS NOT NULL ORDER BY encounters ASC LIMIT 1"
+        )
 
     def _get_longest_shiny_phase(self) -> ShinyPhase | None:
-        return self._query_single_shiny_phase("end_time IS NOT NULL ORDER BY encounters DESC")
+        return self._get_shiny_phase_by_id_query(
+            "SELECT shiny_phase_id FROM shiny_phases WHERE end_time IS NOT NULL ORDER BY encounters DESC LIMIT 1"
+        )
+
+    def _get_shiny_phase_by_id_query(self, query: str) -> ShinyPhase | None:
+        """
+        Runs a query that only returns a shiny phase ID, and then loads that shiny phase.
+        This is a lot cheaper than having SQLite sort the full joined rows of all phases.
+
+        :param query: SQL query returning (at most) one row with a shiny phase ID.
+        :return: The shiny phase, or None if the query did not return anything.
+        """
+        result = self._read_cursor().execute(query).fetchone()
+        if result is None:
+            return None
+        return self._get_shiny_phase_by_id(result[0])
 
     def _query_shiny_phases(
         self, where_clause: str, parameters: tuple | list | None = None, limit: int | None = 10, offset: int = 0
     ) -> Iterable[ShinyPhase]:
-        result = self._cursor.execute(
-            f"""
-            SELECT
-                shiny_phases.shiny_phase_id,
-                shiny_phases.start_time,
-                shiny_phases.end_time,
-                shiny_phases.shiny_encounter_id,
-                shiny_phases.encounters,
-                shiny_phases.anti_shiny_encounters,
-                shiny_phases.highest_iv_sum,
-                shiny_phases.highest_iv_sum_species,
-                shiny_phases.lowest_iv_sum,
-                shiny_phases.lowest_iv_sum_species,
-                shiny_phases.highest_sv,
-                shiny_phases.highest_sv_species,
-                shiny_phases.lowest_sv,
-                shiny_phases.lowest_sv_species,
-                shiny_phases.longest_streak,
-                shiny_phases.longest_streak_species,
-                shiny_phases.current_streak,
-                shiny_phases.current_streak_species,
-                shiny_phases.fishing_attempts,
-                shiny_phases.successful_fishing_attempts,
-                shiny_phases.longest_unsuccessful_fishing_streak,
-                shiny_phases.current_unsuccessful_fishing_streak,
-                shiny_phases.pokenav_calls,
-                shiny_phases.snapshot_total_encounters,
-                shiny_phases.snapshot_total_shiny_encounters,
-                shiny_phases.snapshot_species_encounters,
-                shiny_phases.snapshot_species_shiny_encounters,
-                
-                encounters.encounter_id,
-                encounters.species_id,
-                encounters.personality_value,
-                encounters.shiny_phase_id,
-                encounters.is_shiny,
-                encounters.is_roamer,
-                encounters.matching_custom_catch_filters,
-                encounters.encounter_time,
-                encounters.map,
-                encounters.coordinates,
-                encounters.bot_mode,
-                encounters.type,
-                encounters.outcome,
-                encounters.data
-            FROM shiny_phases
-            LEFT JOIN encounters ON encounters.encounter_id = shiny_phases.shiny_encounter_id
-            {f'WHERE {where_clause}' if where_clause is not None else ''}
-            {f'LIMIT {limit} OFFSET {offset}' if limit is not None else ''}
-            """,
-            [] if parameters is None else parameters,
-        )
+        query = _build_select_query(_SQL_SELECT_SHINY_PHASES, where_clause, "", limit is not None)
+        parameters = [] if parameters is None else list(parameters)
+        if limit is not None:
+            parameters.extend((limit, offset))
+
+        result = self._read_cursor().execute(query, parameters)
 
         for row in result:
             if row[27] is not None:
@@ -445,11 +770,10 @@ class StatsDatabase:
             yield ShinyPhase.from_row_data(row[:27], encounter)
 
     def _query_single_shiny_phase(self, where_clause: str, parameters: tuple | None = None) -> ShinyPhase | None:
-        result = list(self._query_shiny_phases(where_clause, parameters, limit=1))
-        return result[0] if len(result) > 0 else None
+        return next(iter(self._query_shiny_phases(where_clause, parameters, limit=1)), None)
 
     def _get_next_shiny_phase_id(self) -> int:
-        result = self._cursor.execute(
+        result = self._read_cursor().execute(
             "SELECT shiny_phase_id FROM shiny_phases ORDER BY shiny_phase_id DESC LIMIT 1"
         ).fetchone()
         if result is None:
@@ -458,7 +782,7 @@ class StatsDatabase:
             return int(result[0]) + 1
 
     def _get_encounter_summaries(self) -> dict[int, EncounterSummary]:
-        result = self._cursor.execute(
+        result = self._read_cursor().execute(
             """
             SELECT
                 species_id,
@@ -482,8 +806,24 @@ class StatsDatabase:
         )
 
         encounter_summaries = {}
-        for row in result:
-            species_id = int(row[0])
+        # All of these columns have integer affinity, so SQLite already returns them as `int`.
+        for (
+            species_id,
+            _,
+            total_encounters,
+            shiny_encounters,
+            catches,
+            total_highest_iv_sum,
+            total_lowest_iv_sum,
+            total_highest_sv,
+            total_lowest_sv,
+            phase_encounters,
+            phase_highest_iv_sum,
+            phase_lowest_iv_sum,
+            phase_highest_sv,
+            phase_lowest_sv,
+            last_encounter_time,
+        ) in result:
             species_form = None
             if species_id >= 20100 and species_id < 20200:
                 species_form = get_unown_letter_by_index(species_id - 20100)
@@ -491,52 +831,38 @@ class StatsDatabase:
             encounter_summaries[species_id] = EncounterSummary(
                 species=get_species_by_index(species_id),
                 species_form=species_form,
-                total_encounters=int(row[2]),
-                shiny_encounters=int(row[3]),
-                catches=int(row[4]),
-                total_highest_iv_sum=int(row[5]),
-                total_lowest_iv_sum=int(row[6]),
-                total_highest_sv=int(row[7]),
-                total_lowest_sv=int(row[8]),
-                phase_encounters=int(row[9]),
-                phase_highest_iv_sum=int(row[10]) if row[10] is not None else None,
-                phase_lowest_iv_sum=int(row[11]) if row[11] is not None else None,
-                phase_highest_sv=int(row[12]) if row[12] is not None else None,
-                phase_lowest_sv=int(row[13]) if row[13] is not None else None,
-                last_encounter_time=datetime.fromisoformat(row[14]),
+                total_encounters=total_encounters,
+                shiny_encounters=shiny_encounters,
+                catches=catches,
+                total_highest_iv_sum=total_highest_iv_sum,
+                total_lowest_iv_sum=total_lowest_iv_sum,
+                total_highest_sv=total_highest_sv,
+                total_lowest_sv=total_lowest_sv,
+                phase_encounters=phase_encounters,
+                phase_highest_iv_sum=phase_highest_iv_sum,
+                phase_lowest_iv_sum=phase_lowest_iv_sum,
+                phase_highest_sv=phase_highest_sv,
+                phase_lowest_sv=phase_lowest_sv,
+                last_encounter_time=datetime.fromisoformat(last_encounter_time),
             )
 
         return encounter_summaries
 
     def _get_pickup_items(self) -> dict[int, PickupItem]:
-        pickup_items = {}
-        result = self._cursor.execute("SELECT item_id, item_name, times_picked_up FROM pickup_items ORDER BY item_id")
-        for row in result:
-            pickup_items[int(row[0])] = PickupItem(get_item_by_index(int(row[0])), int(row[2]))
-        return pickup_items
+        result = self._read_cursor().execute("SELECT item_id, times_picked_up FROM pickup_items ORDER BY item_id")
+        return {
+            item_id: PickupItem(get_item_by_index(item_id), times_picked_up) for item_id, times_picked_up in result
+        }
 
     def _get_base_data(self) -> dict[str, str | None]:
-        data_list = {}
-        result = self._cursor.execute("SELECT data_key, value FROM base_data ORDER BY data_key")
-        for row in result:
-            data_list[row[0]] = row[1]
-        return data_list
+        return dict(self._read_cursor().execute("SELECT data_key, value FROM base_data ORDER BY data_key"))
 
     def _get_last_encounter(self) -> Encounter | None:
-        result = list(self.query_encounters(limit=1))
-        if len(result) == 0:
-            return None
-        else:
-            return result[0]
+        return next(iter(self.query_encounters(limit=1)), None)
 
     def _insert_encounter(self, encounter: Encounter) -> None:
         self._execute_write(
-            """
-            INSERT INTO encounters
-                (encounter_id, species_id, personality_value, shiny_phase_id, is_shiny, matching_custom_catch_filters, encounter_time, map, coordinates, bot_mode, type, outcome, data)
-            VALUES
-                (?, ?, ?, ?, ? ,?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            _SQL_INSERT_ENCOUNTER,
             (
                 encounter.encounter_id,
                 encounter.species_id,
@@ -556,60 +882,40 @@ class StatsDatabase:
 
     def _update_encounter_outcome(self, encounter: Encounter):
         self._execute_write(
-            "UPDATE encounters SET outcome = ? WHERE encounter_id = ?",
+            _SQL_UPDATE_ENCOUNTER_OUTCOME,
             (encounter.outcome.value, encounter.encounter_id),
         )
 
     def _insert_shiny_phase(self, shiny_phase: ShinyPhase) -> None:
         self._execute_write(
-            "INSERT INTO shiny_phases (shiny_phase_id, start_time) VALUES (?, ?)",
+            _SQL_INSERT_SHINY_PHASE,
             (shiny_phase.shiny_phase_id, shiny_phase.start_time),
         )
 
+    def _queue_shiny_phase_update(self, shiny_phase: ShinyPhase) -> None:
+        """
+        Saves a changed shiny phase to the database. Within a transaction, this is deferred to
+        the end of it, so a phase that changes several times only gets written once.
+
+        :param shiny_phase: The shiny phase that has changed.
+        """
+        if self._transaction_depth > 0:
+            self._pending_shiny_phase_update = shiny_phase
+        else:
+            self._update_shiny_phase(shiny_phase)
+
     def _update_shiny_phase(self, shiny_phase: ShinyPhase) -> None:
         self._execute_write(
-            """
-            UPDATE shiny_phases
-            SET encounters = ?,
-                anti_shiny_encounters = ?,
-                highest_iv_sum = ?,
-                highest_iv_sum_species = ?,
-                lowest_iv_sum = ?,
-                lowest_iv_sum_species = ?,
-                highest_sv = ?,
-                highest_sv_species = ?,
-                lowest_sv = ?,
-                lowest_sv_species = ?,
-                longest_streak = ?,
-                longest_streak_species = ?,
-                current_streak = ?,
-                current_streak_species = ?,
-                fishing_attempts = ?,
-                successful_fishing_attempts = ?,
-                longest_unsuccessful_fishing_streak = ?,
-                current_unsuccessful_fishing_streak = ?,
-                pokenav_calls = ?,
-                snapshot_total_encounters = ?,
-                snapshot_total_shiny_encounters = ?,
-                snapshot_species_encounters = ?,
-                snapshot_species_shiny_encounters = ?
-            WHERE shiny_phase_id = ?
-            """,
+            _SQL_UPDATE_SHINY_PHASE,
             (
                 shiny_phase.encounters,
                 shiny_phase.anti_shiny_encounters,
-                shiny_phase.highest_iv_sum.value if shiny_phase.highest_iv_sum is not None else None,
-                shiny_phase.highest_iv_sum.species_id_for_database if shiny_phase.highest_iv_sum is not None else None,
-                shiny_phase.lowest_iv_sum.value if shiny_phase.lowest_iv_sum is not None else None,
-                shiny_phase.highest_iv_sum.species_id_for_database if shiny_phase.lowest_iv_sum is not None else None,
-                shiny_phase.highest_sv.value if shiny_phase.highest_sv is not None else None,
-                shiny_phase.highest_sv.species_id_for_database if shiny_phase.highest_sv is not None else None,
-                shiny_phase.lowest_sv.value if shiny_phase.lowest_sv is not None else None,
-                shiny_phase.lowest_sv.species_id_for_database if shiny_phase.lowest_sv is not None else None,
-                shiny_phase.longest_streak.value if shiny_phase.longest_streak is not None else None,
-                shiny_phase.longest_streak.species_id_for_database if shiny_phase.longest_streak is not None else None,
-                shiny_phase.current_streak.value if shiny_phase.current_streak is not None else None,
-                shiny_phase.current_streak.species_id_for_database if shiny_phase.current_streak is not None else None,
+                *_species_record_values(shiny_phase.highest_iv_sum),
+                *_species_record_values(shiny_phase.lowest_iv_sum),
+                *_species_record_values(shiny_phase.highest_sv),
+                *_species_record_values(shiny_phase.lowest_sv),
+                *_species_record_values(shiny_phase.longest_streak),
+                *_species_record_values(shiny_phase.current_streak),
                 shiny_phase.fishing_attempts,
                 shiny_phase.successful_fishing_attempts,
                 shiny_phase.longest_unsuccessful_fishing_streak,
@@ -630,7 +936,7 @@ class StatsDatabase:
         """
 
         self._execute_write(
-            "UPDATE shiny_phases SET end_time = ?, shiny_encounter_id = ? WHERE shiny_phase_id = ?",
+            _SQL_END_SHINY_PHASE,
             (encounter.encounter_time, encounter.encounter_id, self.current_shiny_phase.shiny_phase_id),
         )
 
@@ -645,18 +951,27 @@ class StatsDatabase:
             """
         )
 
+    def _queue_encounter_summary_update(self, encounter_summary: EncounterSummary) -> None:
+        """
+        Saves a changed encounter summary to the database. Within a transaction, this is deferred
+        to the end of it, so a summary that changes several times only gets written once.
+
+        :param encounter_summary: The encounter summary that has changed.
+        """
+        if self._transaction_depth > 0:
+            self._pending_encounter_summary_updates[encounter_summary.species_id_for_database] = encounter_summary
+        else:
+            self._insert_or_update_encounter_summary(encounter_summary)
+
     def _insert_or_update_encounter_summary(self, encounter_summary: EncounterSummary) -> None:
-        if encounter_summary.species is None:
-            raise RuntimeError("Cannot save an encounter summary that is not associated to a species.")
+        self._insert_or_update_encounter_summaries((encounter_summary,))
 
-        self._execute_write(
-            """
-            REPLACE INTO encounter_summaries
-                (species_id, species_name, total_encounters, shiny_encounters, catches, total_highest_iv_sum, total_lowest_iv_sum, total_highest_sv, total_lowest_sv, phase_encounters, phase_highest_iv_sum, phase_lowest_iv_sum, phase_highest_sv, phase_lowest_sv, last_encounter_time)
-            VALUES
-                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
+    def _insert_or_update_encounter_summaries(self, encounter_summaries: Iterable[EncounterSummary]) -> None:
+        def get_values(encounter_summary: EncounterSummary) -> tuple:
+            if encounter_summary.species is None:
+                raise RuntimeError("Cannot save an encounter summary that is not associated to a species.")
+
+            return (
                 encounter_summary.species_id_for_database,
                 encounter_summary.species_name,
                 encounter_summary.total_encounters,
@@ -672,24 +987,299 @@ class StatsDatabase:
                 encounter_summary.phase_highest_sv,
                 encounter_summary.phase_lowest_sv,
                 encounter_summary.last_encounter_time,
+            )
+
+        self._execute_write_many(_SQL_UPSERT_ENCOUNTER_SUMMARY, map(get_values, encounter_summaries))
+
+    def _insert_or_update_pickup_items(self, pickup_items: list[PickupItem]) -> None:
+        self._execute_write_many(
+            _SQL_REPLACE_PICKUP_ITEM,
+            (
+                (pickup_item.item.index, pickup_item.item.name, pickup_item.times_picked_up)
+                for pickup_item in pickup_items
             ),
         )
 
-    def _insert_or_update_pickup_item(self, pickup_item: PickupItem) -> None:
-        self._execute_write(
-            "REPLACE INTO pickup_items (item_id, item_name, times_picked_up) VALUES (?, ?, ?)",
-            (pickup_item.item.index, pickup_item.item.name, pickup_item.times_picked_up),
-        )
+    def close(self) -> None:
+        """
+        Writes everything that has been committed so far and stops the background writer. This
+        needs to be called before the bot exits, as commits that are still waiting in the write
+        queue would be lost otherwise. Any changes after this are written right away, on the
+        thread that makes them.
+
+        It also lets SQLite refresh the statistics of tables that have changed a lot since they
+        were last analysed, so that the query planner keeps using the right indices as the
+        encounter log grows.
+        """
+        with self._lock:
+            writer_thread = self._writer_thread
+            if writer_thread is None:
+                return
+            self._writer_thread = None
+            self._write_queue.put(None)
+        writer_thread.join()
+
+        with self._lock:
+            try:
+                self._connection.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                # This is just housekeeping, so it's not worth delaying the shutdown for.
+                pass
+
+    def _read_cursor(self) -> sqlite3.Cursor:
+        """
+        :return: A new cursor for read-only queries, using the calling thread's read connection.
+                 While the database is still being set up (i.e. during schema updates and
+                 migrations) this uses the writing connection, so that uncommitted changes
+                 are visible.
+        """
+        if self._read_connection_uri is None:
+            return self._connection.cursor()
+
+        # This only waits for changes that the calling thread has committed itself. So the bot
+        # always sees its own changes, while other threads (such as the web server) do not have
+        # to wait for the disk and might just see the stats as they were a moment ago.
+        self._wait_for_pending_writes()
+        connection: sqlite3.Connection | None = getattr(self._read_connections, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._read_connection_uri, uri=True, cached_statements=256)
+            _configure_connection(connection)
+            self._read_connections.connection = connection
+        return connection.cursor()
 
     def _execute_write(self, query: str, parameters: list | tuple = ()):
         with self._lock:
+            if self._writer_thread is not None:
+                self._handle_write_error()
+                self._pending_writes.append((query, parameters, False))
+                return
+
             try:
                 self._cursor.execute(query, parameters)
             except (sqlite3.OperationalError, sqlite3.IntegrityError) as exception:
                 self._handle_sqlite_error(exception)
                 raise
 
+    def _execute_write_many(self, query: str, parameters: Iterable[list | tuple]):
+        with self._lock:
+            if self._writer_thread is not None:
+                self._handle_write_error()
+                self._pending_writes.append((query, list(parameters), True))
+                return
+
+            try:
+                self._cursor.executemany(query, parameters)
+            except (sqlite3.OperationalError, sqlite3.IntegrityError) as exception:
+                self._handle_sqlite_error(exception)
+                raise
+
+    def _write_loop(self) -> None:
+        """
+        Runs in a background thread and writes everything that has been committed to the database.
+
+        If several commits are waiting by the time the previous write has finished, they are
+        combined into one transaction. So if writing is slow, there are fewer but larger
+        transactions rather than a growing backlog.
+
+        Whenever nothing has been written for a while, the WAL file is checkpointed and truncated,
+        so that it does not keep growing while the bot is busy.
+        """
+        needs_checkpoint = False
+        is_closing = False
+        while not is_closing:
+            try:
+                first_batch = self._write_queue.get(timeout=_seconds_idle_before_checkpoint)
+            except queue.Empty:
+                if needs_checkpoint:
+                    needs_checkpoint = not self._checkpoint()
+                continue
+
+            if first_batch is None:
+                break
+
+            needs_checkpoint = True
+            batches = [first_batch]
+            number_of_writes = len(first_batch[1])
+            with suppress(queue.Empty):
+                while number_of_writes < _max_writes_per_transaction:
+                    next_batch = self._write_queue.get_nowait()
+                    if next_batch is None:
+                        is_closing = True
+                        break
+                    batches.append(next_batch)
+                    number_of_writes += len(next_batch[1])
+
+            try:
+                self._write_batches([batch for _, batch in batches])
+            except sqlite3.Error as exception:
+                self._log_write_error(exception, len(batches))
+            finally:
+                with self._write_progress:
+                    self._number_of_commits_written = batches[-1][0]
+                    self._write_progress.notify_all()
+
+    def _checkpoint(self) -> bool:
+        """
+        Copies all changes from the WAL file back into the database and truncates the WAL file.
+
+        :return: Whether the checkpoint has been completed. It can fail if another connection
+                 is still reading from the WAL, or if the bot is using the connection right now.
+        """
+        # If the bot's thread holds the lock, it might be waiting for this thread to finish writing,
+        # so we must not block here. The checkpoint will just be tried again later.
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            is_busy, _, _ = self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return is_busy == 0
+        except sqlite3.Error:
+            return False
+        finally:
+            self._lock.release()
+
+    def _write_batches(self, batches: list[list[tuple[str, list | tuple, bool]]]) -> None:
+        """
+        Executes a list of write batches (as created by `_commit()`) in a single transaction.
+
+        :param batches: List of batches, which each are a list of `(query, parameters, is_executemany)`.
+        """
+        for attempt in range(_write_attempts_when_busy):
+            query = "BEGIN IMMEDIATE"
+            try:
+                self._cursor.execute(query)
+                for batch in batches:
+                    # Consecutive executions of the same statement are passed to SQLite in one go.
+                    for (query, is_executemany), writes in groupby(batch, key=lambda write: (write[0], write[2])):
+                        if is_executemany:
+                            for _, parameters, _ in writes:
+                                self._cursor.executemany(query, parameters)
+                        else:
+                            self._cursor.executemany(query, [parameters for _, parameters, _ in writes])
+                query = "COMMIT"
+                self._connection.commit()
+                return
+            except sqlite3.Error as exception:
+                self._connection.rollback()
+                is_busy = getattr(exception, "sqlite_errorcode", None) == sqlite3.SQLITE_BUSY
+                if not is_busy or attempt == _write_attempts_when_busy - 1:
+                    exception.add_note(f"Query: {textwrap.dedent(query).strip()}")
+                    raise
+
+    def _log_write_error(self, exception: sqlite3.Error, number_of_commits: int) -> None:
+        """
+        Reports an error that occurred in the background writer, right when it happened.
+
+        Errors that mean the bot cannot continue are also handed over to the bot's thread,
+        which stops the bot the next time it writes something (see `_handle_write_error()`.)
+
+        :param exception: The error raised by `_write_batches()`.
+        :param number_of_commits: Number of commits that were part of the failed transaction.
+        """
+        notes = "\n".join(getattr(exception, "__notes__", []))
+        console.print(
+            "\n[bold red]Error: Could not write to stats database.[/]\n\n"
+            f"[red]{number_of_commits:,} change(s) to the stats could not be saved.\n\n"
+            f"{escape(notes)}\n"
+            f"Original error: {escape(str(exception))}[/]"
+        )
+        if isinstance(exception, (sqlite3.OperationalError, sqlite3.IntegrityError)):
+            with self._write_error_lock:
+                self._write_error = exception
+
+    def _wait_for_pending_writes(self, include_other_threads: bool = False) -> None:
+        """
+        Blocks until the background writer has written everything that the calling thread has
+        committed so far. This is used before reading, so that queries see all the changes that
+        the bot has made.
+
+        :param include_other_threads: Whether to also wait for commits made by other threads.
+        """
+        if self._writer_thread is None:
+            return
+
+        if include_other_threads:
+            with self._lock:
+                commit_number = self._number_of_commits_queued
+        else:
+            commit_number = getattr(self._last_commit_of_thread, "commit_number", 0)
+
+        with self._write_progress:
+            self._write_progress.wait_for(lambda: self._number_of_commits_written >= commit_number)
+
+    def _handle_write_error(self) -> None:
+        """
+        Stops the bot if the background writer has run into an error that it cannot recover
+        from. The writer has already logged the error, so anything else is ignored here.
+        """
+        with self._write_error_lock:
+            exception = self._write_error
+            self._write_error = None
+
+        if exception is not None:
+            self._handle_sqlite_error(exception)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Groups all writes within the `with` block into a single transaction, so they
+        get committed (and synced to disk) together rather than one by one. If the block
+        raises an exception, the transaction is rolled back instead.
+
+        `BEGIN IMMEDIATE` acquires the write lock right away, so we find out about another
+        process holding the database before having done any work.
+
+        Transactions can be nested, in which case only the outermost one commits.
+        """
+        with self._lock:
+            if self._transaction_depth > 0:
+                self._transaction_depth += 1
+                try:
+                    yield
+                finally:
+                    self._transaction_depth -= 1
+                return
+
+            if self._writer_thread is None:
+                self._execute_write("BEGIN IMMEDIATE")
+            number_of_earlier_writes = len(self._pending_writes)
+            self._transaction_depth = 1
+            try:
+                yield
+                if self._pending_shiny_phase_update is not None:
+                    self._update_shiny_phase(self._pending_shiny_phase_update)
+                if len(self._pending_encounter_summary_updates) > 0:
+                    self._insert_or_update_encounter_summaries(self._pending_encounter_summary_updates.values())
+            except BaseException:
+                if self._writer_thread is None:
+                    self._connection.rollback()
+                else:
+                    del self._pending_writes[number_of_earlier_writes:]
+                raise
+            finally:
+                self._transaction_depth = 0
+                self._pending_shiny_phase_update = None
+                self._pending_encounter_summary_updates.clear()
+            self._commit()
+
     def _commit(self) -> None:
+        # Every change to the stats ends with a commit, so this is where the cached `GlobalStats`
+        # gets invalidated (see `get_global_stats()`.)
+        self._stats_version += 1
+
+        # Within `_transaction()`, committing is left to the end of the outermost transaction.
+        if self._transaction_depth > 0:
+            return
+
+        if self._writer_thread is not None:
+            with self._lock:
+                self._handle_write_error()
+                if len(self._pending_writes) > 0:
+                    self._number_of_commits_queued += 1
+                    self._write_queue.put((self._number_of_commits_queued, self._pending_writes))
+                    self._last_commit_of_thread.commit_number = self._number_of_commits_queued
+                    self._pending_writes = []
+            return
+
         try:
             self._connection.commit()
         except sqlite3.OperationalError as exception:
@@ -697,7 +1287,8 @@ class StatsDatabase:
             raise
 
     def _handle_sqlite_error(self, exception: sqlite3.OperationalError | sqlite3.IntegrityError) -> None:
-        if exception.sqlite_errorname == "SQLITE_BUSY":
+        error_code = getattr(exception, "sqlite_errorcode", None)
+        if error_code == sqlite3.SQLITE_BUSY:
             console.print(
                 "\n[bold red]Error: Stats database is locked[/]\n\n"
                 "[red]We could not write to the statistics database because it is being used by another process.\n"
@@ -708,9 +1299,7 @@ class StatsDatabase:
                 "As a last resort, restarting your computer might help.[/]"
             )
             sys.exit(1)
-        elif exception.sqlite_errorname == "SQLITE_CONSTRAINT_PRIMARYKEY" and "encounters.encounter_id" in str(
-            exception
-        ):
+        elif error_code == sqlite3.SQLITE_CONSTRAINT_PRIMARYKEY and "encounters.encounter_id" in str(exception):
             console.print(
                 "\n[bold red]Error: Could not write encounter to stats database.[/]\n\n"
                 "[red]We could not log this encounter to the statistics database because the encounter ID we chose "
@@ -748,6 +1337,11 @@ class StatsDatabase:
         """
         :return: The version number of the database schema, or 0 if this is a new database.
         """
+        schema_version = self._cursor.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version > 0:
+            return schema_version
+
+        # Up to version 5, the schema version was stored in a table rather than the database header.
         result = self._cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'")
         if result.fetchone() is None:
             return 0
@@ -766,7 +1360,7 @@ class StatsDatabase:
 
         ```python
             if from_schema_version <= 3:
-                self._cursor.execute(...)
+                script += _SCHEMA_V3_SCRIPT
         ```
 
         and these blocks should be sorted by the `from_schema_version` value they check
@@ -780,148 +1374,36 @@ class StatsDatabase:
                                     no database.)
         """
 
+        script = "BEGIN IMMEDIATE;\n"
         if from_schema_version <= 0:
-            self._execute_write("CREATE TABLE schema_version (version INT UNSIGNED)")
-
-            self._execute_write(
-                dedent(
-                    """
-                    CREATE TABLE base_data (
-                        data_key INT UNSIGNED PRIMARY KEY,
-                        value TEXT DEFAULT NULL
-                    )
-                    """
-                )
-            )
-
-            self._execute_write(
-                dedent(
-                    """
-                    CREATE TABLE encounter_summaries (
-                        species_id INT UNSIGNED PRIMARY KEY,
-                        species_name TEXT NOT NULL,
-                        total_encounters INT UNSIGNED,
-                        shiny_encounters INT UNSIGNED,
-                        catches INT UNSIGNED,
-                        total_highest_iv_sum INT UNSIGNED,
-                        total_lowest_iv_sum INT UNSIGNED,
-                        total_highest_sv INT UNSIGNED,
-                        total_lowest_sv INT UNSIGNED,
-                        phase_encounters INT UNSIGNED,
-                        phase_highest_iv_sum INT UNSIGNED DEFAULT NULL,
-                        phase_lowest_iv_sum INT UNSIGNED DEFAULT NULL,
-                        phase_highest_sv INT UNSIGNED DEFAULT NULL,
-                        phase_lowest_sv INT UNSIGNED DEFAULT NULL,
-                        last_encounter_time DATETIME
-                    )
-                    """
-                )
-            )
-
-            self._execute_write(
-                dedent(
-                    """
-                    CREATE TABLE shiny_phases (
-                        shiny_phase_id INT UNSIGNED PRIMARY KEY,
-                        start_time DATETIME NOT NULL,
-                        end_time DATETIME DEFAULT NULL,
-                        shiny_encounter_id INT UNSIGNED DEFAULT NULL,
-                        encounters INT UNSIGNED DEFAULT 0,
-                        highest_iv_sum INT UNSIGNED DEFAULT NULL,
-                        highest_iv_sum_species INT UNSIGNED DEFAULT NULL,
-                        lowest_iv_sum INT UNSIGNED DEFAULT NULL,
-                        lowest_iv_sum_species INT UNSIGNED DEFAULT NULL,
-                        highest_sv INT UNSIGNED DEFAULT NULL,
-                        highest_sv_species INT UNSIGNED DEFAULT NULL,
-                        lowest_sv INT UNSIGNED DEFAULT NULL,
-                        lowest_sv_species INT UNSIGNED DEFAULT NULL,
-                        longest_streak INT UNSIGNED DEFAULT 0,
-                        longest_streak_species INT UNSIGNED DEFAULT NULL,
-                        current_streak INT UNSIGNED DEFAULT 0,
-                        current_streak_species INT UNSIGNED DEFAULT NULL,
-                        fishing_attempts INT UNSIGNED DEFAULT 0,
-                        successful_fishing_attempts INT UNSIGNED DEFAULT 0,
-                        longest_unsuccessful_fishing_streak INT UNSIGNED DEFAULT 0,
-                        current_unsuccessful_fishing_streak INT UNSIGNED DEFAULT 0,
-                        snapshot_total_encounters INT UNSIGNED DEFAULT NULL,
-                        snapshot_total_shiny_encounters INT UNSIGNED DEFAULT NULL,
-                        snapshot_species_encounters INT UNSIGNED DEFAULT NULL,
-                        snapshot_species_shiny_encounters INT UNSIGNED DEFAULT NULL
-                    )
-                    """
-                )
-            )
-
-            self._execute_write(
-                dedent(
-                    """
-                    CREATE TABLE encounters (
-                        encounter_id INT UNSIGNED PRIMARY KEY,
-                        species_id INT UNSIGNED NOT NULL,
-                        personality_value INT UNSIGNED NOT NULL,
-                        shiny_phase_id INT UNSIGNED NOT NULL,
-                        is_shiny INT UNSIGNED DEFAULT 0,
-                        is_roamer INT UNSIGNED DEFAULT 0,
-                        matching_custom_catch_filters TEXT DEFAULT NULL,
-                        encounter_time DATETIME NOT NULL,
-                        map TEXT,
-                        coordinates TEXT,
-                        bot_mode TEXT,
-                        type TEXT DEFAULT NULL,
-                        outcome INT UNSIGNED DEFAULT NULL,
-                        data BLOB NOT NULL
-                    )
-                    """
-                )
-            )
-
-            self._execute_write(
-                dedent(
-                    """
-                    CREATE TABLE pickup_items (
-                        item_id INT UNSIGNED PRIMARY KEY,
-                        item_name TEXT NOT NULL,
-                        times_picked_up INT NOT NULL DEFAULT 0
-                    )
-                    """
-                )
-            )
-
+            script += _SCHEMA_V0_SCRIPT
         if from_schema_version <= 1:
-            self._execute_write(
-                dedent(
-                    """
-                    ALTER TABLE shiny_phases
-                        ADD pokenav_calls INT UNSIGNED DEFAULT 0
-                    """
-                )
-            )
-
-            self._execute_write(
-                dedent(
-                    """
-                    DROP TABLE base_data
-                    """
-                )
-            )
-
-            self._execute_write(
-                dedent(
-                    """
-                    CREATE TABLE base_data (
-                        data_key TEXT PRIMARY KEY,
-                        value TEXT DEFAULT NULL
-                    )
-                    """
-                )
-            )
-
+            script += _SCHEMA_V1_SCRIPT
         if from_schema_version <= 2:
-            self._execute_write(dedent("""
-                ALTER TABLE shiny_phases
-                    ADD anti_shiny_encounters INT UNSIGNED DEFAULT 0
-                """))
-
-        self._execute_write("DELETE FROM schema_version")
-        self._execute_write("INSERT INTO schema_version VALUES (?)", (current_schema_version,))
-        self._connection.commit()
+            script += _SCHEMA_V2_SCRIPT
+        if from_schema_version <= 3:
+            script += _SCHEMA_V3_SCRIPT
+        if from_schema_version <= 4:
+            script += _SCHEMA_V4_SCRIPT
+        # From version 6 on, the schema version is read from the database header (`PRAGMA user_version`.)
+        # The `schema_version` table is still kept up-to-date, because older releases of the bot only
+        # look at the table and would otherwise not notice that the database is too new for them.
+        script += "DELETE FROM schema_version;\n"
+        script += f"INSERT INTO schema_version VALUES ({current_schema_version});\n"
+        script += f"PRAGMA user_version = {current_schema_version};\n"
+        script += "COMMIT;\n"
+
+        # The whole update is passed to SQLite in one go. `executescript()` does not take part in
+        # the connection's transaction handling, so the transaction is part of the script itself
+        # and needs to be rolled back manually if one of the statements fails.
+        with self._lock:
+            try:
+                self._cursor.executescript(script)
+            except (sqlite3.OperationalError, sqlite3.IntegrityError) as exception:
+                self._connection.rollback()
+                self._handle_sqlite_error(exception)
+                raise
+
+        # Gathers statistics about the tables and indices, so that the query planner can make
+        # use of the new indices.
+        self._execute_write("ANALYZE")
@@ -1,18 +1,24 @@
 # Copyright (c) 2026 realgarit
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from functools import cached_property
 from typing import TYPE_CHECKING
 
 from modules.battle.battle_state import BattleOutcome, EncounterType
 from modules.items.items import Item
-from modules.pokemon.pokemon import Pokemon, Species, get_species_by_index, get_unown_letter_by_index, get_unown_index_by_letter
+from modules.pokemon.pokemon import Pokemon, Species, get_species_by_index, get_unown_letter_by_index
 from modules.items.fishing import FishingAttempt, FishingResult
 
 if TYPE_CHECKING:
     pass
 
 
+# Unown is the only species that the stats keep apart by form. Each letter is stored with its
+# own species ID, starting at 20100.
+_unown_species_index = 201
+_unown_stats_id_by_letter: dict[str, int] = {get_unown_letter_by_index(index): 20100 + index for index in range(28)}
+
+
 class StatsDatabaseSchemaTooNew(Exception):
     pass
 
@@ -22,7 +28,7 @@ class BaseData:
     value: str | None
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeciesRecord:
     value: int
     species: "Species"
@@ -33,13 +39,13 @@ class SpeciesRecord:
         if not species_id:
             return None
         elif species_id >= 20100 and species_id < 20200:
-            return cls(value, get_species_by_index(201), get_unown_letter_by_index(species_id - 20100))
+            return cls(value, get_species_by_index(_unown_species_index), get_unown_letter_by_index(species_id - 20100))
         else:
             return cls(value, get_species_by_index(species_id))
 
     @classmethod
     def create(cls, value, pokemon: "Pokemon") -> "SpeciesRecord":
-        if pokemon.species.name == "Unown":
+        if pokemon.species.index == _unown_species_index:
             return cls(value, pokemon.species, pokemon.unown_letter)
         else:
             return cls(value, pokemon.species)
@@ -47,24 +53,6 @@ class SpeciesRecord:
     def __int__(self):
         return self.value
 
-    def __eq__(self, value):
-        return self.value == value if isinstance(value, (int, float)) else NotImplemented
-
-    def __ne__(self, value):
-        return self.value != value if isinstance(value, (int, float)) else NotImplemented
-
-    def __gt__(self, value):
-        return self.value > value if isinstance(value, (int, float)) else NotImplemented
-
-    def __ge__(self, value):
-        return self.value >= value if isinstance(value, (int, float)) else NotImplemented
-
-    def __lt__(self, value):
-        return self.value < value if isinstance(value, (int, float)) else NotImplemented
-
-    def __le__(self, value):
-        return self.value <= value if isinstance(value, (int, float)) else NotImplemented
-
     def __iadd__(self, value):
         if isinstance(value, int):
             self.value += value
@@ -73,23 +61,21 @@ class SpeciesRecord:
             return NotImplemented
 
     def is_same_species(self, pokemon: "Pokemon") -> bool:
-        return pokemon.species.index == self.species.index and (
-            pokemon.species.name != "Unown" or pokemon.unown_letter == self.species_form
-        )
+        return pokemon.species_id_for_stats == self.species_id_for_database
 
     def copy(self) -> "SpeciesRecord":
         return SpeciesRecord(self.value, self.species, self.species_form)
 
     @property
     def species_id_for_database(self) -> int:
-        if self.species.name == "Unown" and self.species_form is not None:
-            return 20100 + get_unown_index_by_letter(self.species_form)
+        if self.species.index == _unown_species_index and self.species_form is not None:
+            return _unown_stats_id_by_letter[self.species_form]
         else:
             return self.species.index
 
     @property
     def species_name(self) -> str:
-        if self.species.name == "Unown" and self.species_form is not None:
+        if self.species.index == _unown_species_index and self.species_form is not None:
             return f"{self.species.name} ({self.species_form})"
         else:
             return self.species.name
@@ -101,7 +87,7 @@ class SpeciesRecord:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Encounter:
     encounter_id: int
     shiny_phase_id: int
@@ -116,17 +102,33 @@ class Encounter:
 
     @classmethod
     def from_row_data(cls, row: list | tuple) -> "Encounter":
+        (
+            encounter_id,
+            _,
+            _,
+            shiny_phase_id,
+            _,
+            _,
+            matching_custom_catch_filters,
+            encounter_time,
+            map_name,
+            coordinates,
+            bot_mode,
+            encounter_type,
+            outcome,
+            data,
+        ) = row
         return Encounter(
-            encounter_id=row[0],
-            shiny_phase_id=row[3],
-            matching_custom_catch_filters=row[6],
-            encounter_time=datetime.fromisoformat(row[7]),
-            map=row[8],
-            coordinates=row[9],
-            bot_mode=row[10],
-            type=EncounterType(row[11]) if row[11] else None,
-            outcome=BattleOutcome(row[12]) if row[12] else None,
-            pokemon=Pokemon(row[13]),
+            encounter_id=encounter_id,
+            shiny_phase_id=shiny_phase_id,
+            matching_custom_catch_filters=matching_custom_catch_filters,
+            encounter_time=datetime.fromisoformat(encounter_time),
+            map=map_name,
+            coordinates=coordinates,
+            bot_mode=bot_mode,
+            type=EncounterType(encounter_type) if encounter_type else None,
+            outcome=BattleOutcome(outcome) if outcome else None,
+            pokemon=Pokemon(data),
         )
 
     @property
@@ -168,7 +170,7 @@ class Encounter:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class EncounterSummary:
     species: "Species"
     species_form: str | None
@@ -188,54 +190,63 @@ class EncounterSummary:
 
     @classmethod
     def create(cls, encounter: Encounter) -> "EncounterSummary":
+        species = encounter.pokemon.species
+        is_shiny = encounter.is_shiny
+        iv_sum = encounter.iv_sum
+        shiny_value = encounter.shiny_value
         return cls(
-            species=encounter.pokemon.species,
-            species_form=encounter.pokemon.unown_letter if encounter.pokemon.species.name == "Unown" else None,
+            species=species,
+            species_form=encounter.pokemon.unown_letter if species.index == _unown_species_index else None,
             total_encounters=1,
-            shiny_encounters=0 if not encounter.is_shiny else 1,
+            shiny_encounters=0 if not is_shiny else 1,
             catches=0,
-            total_highest_iv_sum=encounter.iv_sum,
-            total_lowest_iv_sum=encounter.iv_sum,
-            total_highest_sv=encounter.shiny_value,
-            total_lowest_sv=encounter.shiny_value,
-            phase_encounters=1 if not encounter.is_shiny else 0,
-            phase_highest_iv_sum=encounter.iv_sum if not encounter.is_shiny else None,
-            phase_lowest_iv_sum=encounter.iv_sum if not encounter.is_shiny else None,
-            phase_highest_sv=encounter.shiny_value if not encounter.is_shiny else None,
-            phase_lowest_sv=encounter.shiny_value if not encounter.is_shiny else None,
+            total_highest_iv_sum=iv_sum,
+            total_lowest_iv_sum=iv_sum,
+            total_highest_sv=shiny_value,
+            total_lowest_sv=shiny_value,
+            phase_encounters=1 if not is_shiny else 0,
+            phase_highest_iv_sum=iv_sum if not is_shiny else None,
+            phase_lowest_iv_sum=iv_sum if not is_shiny else None,
+            phase_highest_sv=shiny_value if not is_shiny else None,
+            phase_lowest_sv=shiny_value if not is_shiny else None,
             last_encounter_time=encounter.encounter_time,
         )
 
     def update(self, encounter: Encounter):
+        # These are worked out from the Pokémon data each time they are accessed.
+        is_shiny = encounter.is_shiny
+        iv_sum = encounter.iv_sum
+        shiny_value = encounter.shiny_value
+
         self.total_encounters += 1
         self.last_encounter_time = encounter.encounter_time
 
-        if self.total_highest_iv_sum < encounter.iv_sum:
-            self.total_highest_iv_sum = encounter.iv_sum
+        if self.total_highest_iv_sum < iv_sum:
+            self.total_highest_iv_sum = iv_sum
 
-        if self.total_lowest_iv_sum > encounter.iv_sum:
-            self.total_lowest_iv_sum = encounter.iv_sum
+        if self.total_lowest_iv_sum > iv_sum:
+            self.total_lowest_iv_sum = iv_sum
 
-        if self.total_highest_sv < encounter.shiny_value:
-            self.total_highest_sv = encounter.shiny_value
+        if self.total_highest_sv < shiny_value:
+            self.total_highest_sv = shiny_value
 
-        if self.total_lowest_sv > encounter.shiny_value:
-            self.total_lowest_sv = encounter.shiny_value
+        if self.total_lowest_sv > shiny_value:
+            self.total_lowest_sv = shiny_value
 
         self.phase_encounters += 1
 
-        if self.phase_highest_iv_sum is None or self.phase_highest_iv_sum < encounter.iv_sum:
-            self.phase_highest_iv_sum = encounter.iv_sum
+        if self.phase_highest_iv_sum is None or self.phase_highest_iv_sum < iv_sum:
+            self.phase_highest_iv_sum = iv_sum
 
-        if self.phase_lowest_iv_sum is None or self.phase_lowest_iv_sum > encounter.iv_sum:
-            self.phase_lowest_iv_sum = encounter.iv_sum
+        if self.phase_lowest_iv_sum is None or self.phase_lowest_iv_sum > iv_sum:
+            self.phase_lowest_iv_sum = iv_sum
 
-        if not encounter.is_shiny:
-            if self.phase_highest_sv is None or self.phase_highest_sv < encounter.shiny_value:
-                self.phase_highest_sv = encounter.shiny_value
+        if not is_shiny:
+            if self.phase_highest_sv is None or self.phase_highest_sv < shiny_value:
+                self.phase_highest_sv = shiny_value
 
-            if self.phase_lowest_sv is None or self.phase_lowest_sv > encounter.shiny_value:
-                self.phase_lowest_sv = encounter.shiny_value
+            if self.phase_lowest_sv is None or self.phase_lowest_sv > shiny_value:
+                self.phase_lowest_sv = shiny_value
         else:
             self.shiny_encounters += 1
 
@@ -244,20 +255,18 @@ class EncounterSummary:
             self.catches += 1
 
     def is_same_species(self, pokemon: "Pokemon") -> bool:
-        return pokemon.species.index == self.species.index and (
-            pokemon.species.name != "Unown" or pokemon.unown_letter == self.species_form
-        )
+        return pokemon.species_id_for_stats == self.species_id_for_database
 
     @property
     def species_id_for_database(self) -> int:
-        if self.species.name == "Unown" and self.species_form is not None:
-            return 20100 + get_unown_index_by_letter(self.species_form)
+        if self.species.index == _unown_species_index and self.species_form is not None:
+            return _unown_stats_id_by_letter[self.species_form]
         else:
             return self.species.index
 
     @property
     def species_name(self) -> str:
-        if self.species.name == "Unown" and self.species_form is not None:
+        if self.species.index == _unown_species_index and self.species_form is not None:
             return f"{self.species.name} ({self.species_form})"
         else:
             return self.species.name
@@ -282,7 +291,7 @@ class EncounterSummary:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ShinyPhase:
     shiny_phase_id: int
     start_time: datetime
@@ -309,28 +318,57 @@ class ShinyPhase:
 
     @classmethod
     def from_row_data(cls, row: list | tuple, shiny_encounter: Encounter | None) -> "ShinyPhase":
+        (
+            shiny_phase_id,
+            start_time,
+            end_time,
+            _,
+            encounters,
+            anti_shiny_encounters,
+            highest_iv_sum,
+            highest_iv_sum_species,
+            lowest_iv_sum,
+            lowest_iv_sum_species,
+            highest_sv,
+            highest_sv_species,
+            lowest_sv,
+            lowest_sv_species,
+            longest_streak,
+            longest_streak_species,
+            current_streak,
+            current_streak_species,
+            fishing_attempts,
+            successful_fishing_attempts,
+            longest_unsuccessful_fishing_streak,
+            current_unsuccessful_fishing_streak,
+            pokenav_calls,
+            snapshot_total_encounters,
+            snapshot_total_shiny_encounters,
+            snapshot_species_encounters,
+            snapshot_species_shiny_encounters,
+        ) = row
         return ShinyPhase(
-            row[0],
-            datetime.fromisoformat(row[1]),
-            datetime.fromisoformat(row[2]) if row[2] is not None else None,
+            shiny_phase_id,
+            datetime.fromisoformat(start_time),
+            datetime.fromisoformat(end_time) if end_time is not None else None,
             shiny_encounter,
-            row[4],
-            row[5],
-            SpeciesRecord.from_row_values(row[6], row[7]),
-            SpeciesRecord.from_row_values(row[8], row[9]),
-            SpeciesRecord.from_row_values(row[10], row[11]),
-            SpeciesRecord.from_row_values(row[12], row[13]),
-            SpeciesRecord.from_row_values(row[14], row[15]),
-            SpeciesRecord.from_row_values(row[16], row[17]),
-            row[18],
-            row[19],
-            row[20],
-            row[21],
-            row[22],
-            row[23],
-            row[24],
-            row[25],
-            row[26],
+            encounters,
+            anti_shiny_encounters,
+            SpeciesRecord.from_row_values(highest_iv_sum, highest_iv_sum_species),
+            SpeciesRecord.from_row_values(lowest_iv_sum, lowest_iv_sum_species),
+            SpeciesRecord.from_row_values(highest_sv, highest_sv_species),
+            SpeciesRecord.from_row_values(lowest_sv, lowest_sv_species),
+            SpeciesRecord.from_row_values(longest_streak, longest_streak_species),
+            SpeciesRecord.from_row_values(current_streak, current_streak_species),
+            fishing_attempts,
+            successful_fishing_attempts,
+            longest_unsuccessful_fishing_streak,
+            current_unsuccessful_fishing_streak,
+            pokenav_calls,
+            snapshot_total_encounters,
+            snapshot_total_shiny_encounters,
+            snapshot_species_encounters,
+            snapshot_species_shiny_encounters,
         )
 
     @classmethod
@@ -338,31 +376,47 @@ class ShinyPhase:
         return cls(shiny_phase_id=shiny_phase_id, start_time=start_time)
 
     def update(self, encounter: Encounter):
+        # These are worked out from the Pokémon data each time they are accessed.
+        pokemon = encounter.pokemon
+        is_shiny = encounter.is_shiny
+        iv_sum = encounter.iv_sum
+        shiny_value = encounter.shiny_value
+
         self.encounters += 1
 
-        if encounter.pokemon.is_anti_shiny:
+        if pokemon.is_anti_shiny:
             self.anti_shiny_encounters += 1
 
-        if self.highest_iv_sum is None or self.highest_iv_sum < encounter.iv_sum:
-            self.highest_iv_sum = SpeciesRecord.create(encounter.iv_sum, encounter.pokemon)
+        if self.highest_iv_sum is None or self.highest_iv_sum.value < iv_sum:
+            self.highest_iv_sum = SpeciesRecord.create(iv_sum, pokemon)
 
-        if self.lowest_iv_sum is None or self.lowest_iv_sum > encounter.iv_sum:
-            self.lowest_iv_sum = SpeciesRecord.create(encounter.iv_sum, encounter.pokemon)
+        if self.lowest_iv_sum is None or self.lowest_iv_sum.value > iv_sum:
+            self.lowest_iv_sum = SpeciesRecord.create(iv_sum, pokemon)
 
-        if not encounter.is_shiny:
-            if self.highest_sv is None or self.highest_sv < encounter.shiny_value:
-                self.highest_sv = SpeciesRecord.create(encounter.shiny_value, encounter.pokemon)
+        if not is_shiny:
+            if self.highest_sv is None or self.highest_sv.value < shiny_value:
+                self.highest_sv = SpeciesRecord.create(shiny_value, pokemon)
 
-            if self.lowest_sv is None or self.lowest_sv > encounter.shiny_value:
-                self.lowest_sv = SpeciesRecord.create(encounter.shiny_value, encounter.pokemon)
+            if self.lowest_sv is None or self.lowest_sv.value > shiny_value:
+                self.lowest_sv = SpeciesRecord.create(shiny_value, pokemon)
 
-        if self.current_streak is None or not self.current_streak.is_same_species(encounter.pokemon):
-            self.current_streak = SpeciesRecord.create(1, encounter.pokemon)
+        if self.current_streak is None or not self.current_streak.is_same_species(pokemon):
+            self.current_streak = SpeciesRecord.create(1, pokemon)
         else:
             self.current_streak += 1
 
-        if self.longest_streak is None or self.current_streak.value > self.longest_streak.value:
+        if self.longest_streak is None:
             self.longest_streak = self.current_streak.copy()
+        elif self.current_streak.value > self.longest_streak.value:
+            # While the current streak is the longest one, this happens on every encounter. So rather
+            # than creating a new record each time, the existing one is updated if it is the same species.
+            if (
+                self.longest_streak.species is self.current_streak.species
+                and self.longest_streak.species_form == self.current_streak.species_form
+            ):
+                self.longest_streak.value = self.current_streak.value
+            else:
+                self.longest_streak = self.current_streak.copy()
 
     def update_fishing_attempt(self, attempt: FishingAttempt):
         self.fishing_attempts += 1
@@ -377,13 +431,14 @@ class ShinyPhase:
     def update_snapshot(self, encounter_summaries: dict[int, "EncounterSummary"]):
         self.snapshot_total_encounters = 0
         self.snapshot_total_shiny_encounters = 0
-        for species_id in encounter_summaries:
-            encounter_summary = encounter_summaries[species_id]
+        for encounter_summary in encounter_summaries.values():
             self.snapshot_total_encounters += encounter_summary.total_encounters
             self.snapshot_total_shiny_encounters += encounter_summary.shiny_encounters
-            if encounter_summaries[species_id].is_same_species(self.shiny_encounter.pokemon):
-                self.snapshot_species_encounters = encounter_summary.total_encounters
-                self.snapshot_species_shiny_encounters = encounter_summary.shiny_encounters
+
+        species_summary = encounter_summaries.get(self.shiny_encounter.pokemon.species_id_for_stats)
+        if species_summary is not None:
+            self.snapshot_species_encounters = species_summary.total_encounters
+            self.snapshot_species_shiny_encounters = species_summary.shiny_encounters
 
     def to_dict(self) -> dict:
         return {
@@ -415,7 +470,7 @@ class ShinyPhase:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class EncounterTotals:
     total_encounters: int = 0
     shiny_encounters: int = 0
@@ -433,37 +488,46 @@ class EncounterTotals:
     @classmethod
     def from_summaries(cls, encounter_summaries: dict[int, "EncounterSummary"]) -> "EncounterTotals":
         totals = cls()
-        for species_id in encounter_summaries:
-            encounter_summary = encounter_summaries[species_id]
-
+        for encounter_summary in encounter_summaries.values():
             totals.total_encounters += encounter_summary.total_encounters
             totals.shiny_encounters += encounter_summary.shiny_encounters
             totals.catches += encounter_summary.catches
             totals.phase_encounters += encounter_summary.phase_encounters
 
-            values_to_total = [
-                ("total_highest_iv_sum", max),
-                ("total_lowest_iv_sum", min),
-                ("total_highest_sv", max),
-                ("total_lowest_sv", min),
-                ("phase_highest_iv_sum", max),
-                ("phase_lowest_iv_sum", min),
-                ("phase_highest_sv", max),
-                ("phase_lowest_sv", min),
-            ]
-            for property_name, comparison in values_to_total:
-                total_value = getattr(totals, property_name)
-                summary_value = getattr(encounter_summary, property_name)
-                if (total_value is None and summary_value is not None) or (
-                    total_value is not None
-                    and summary_value is not None
-                    and comparison(total_value, summary_value) != total_value
-                ):
-                    setattr(
-                        totals,
-                        property_name,
-                        SpeciesRecord(summary_value, encounter_summary.species, encounter_summary.species_form),
-                    )
+            species = encounter_summary.species
+            species_form = encounter_summary.species_form
+
+            value = encounter_summary.total_highest_iv_sum
+            if value is not None and (totals.total_highest_iv_sum is None or totals.total_highest_iv_sum.value < value):
+                totals.total_highest_iv_sum = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.total_lowest_iv_sum
+            if value is not None and (totals.total_lowest_iv_sum is None or totals.total_lowest_iv_sum.value > value):
+                totals.total_lowest_iv_sum = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.total_highest_sv
+            if value is not None and (totals.total_highest_sv is None or totals.total_highest_sv.value < value):
+                totals.total_highest_sv = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.total_lowest_sv
+            if value is not None and (totals.total_lowest_sv is None or totals.total_lowest_sv.value > value):
+                totals.total_lowest_sv = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.phase_highest_iv_sum
+            if value is not None and (totals.phase_highest_iv_sum is None or totals.phase_highest_iv_sum.value < value):
+                totals.phase_highest_iv_sum = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.phase_lowest_iv_sum
+            if value is not None and (totals.phase_lowest_iv_sum is None or totals.phase_lowest_iv_sum.value > value):
+                totals.phase_lowest_iv_sum = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.phase_highest_sv
+            if value is not None and (totals.phase_highest_sv is None or totals.phase_highest_sv.value < value):
+                totals.phase_highest_sv = SpeciesRecord(value, species, species_form)
+
+            value = encounter_summary.phase_lowest_sv
+            if value is not None and (totals.phase_lowest_sv is None or totals.phase_lowest_sv.value > value):
+                totals.phase_lowest_sv = SpeciesRecord(value, species, species_form)
 
         return totals
 
@@ -484,7 +548,7 @@ class EncounterTotals:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class PickupItem:
     item: "Item"
     times_picked_up: int = 0
@@ -497,23 +561,20 @@ class GlobalStats:
     current_shiny_phase: ShinyPhase | None
     longest_shiny_phase: ShinyPhase | None
     shortest_shiny_phase: ShinyPhase | None
+    _dict: dict | None = field(default=None, init=False, repr=False, compare=False)
 
     @cached_property
     def totals(self) -> EncounterTotals:
         return EncounterTotals.from_summaries(self.encounter_summaries)
 
     def species(self, pokemon: Pokemon) -> EncounterSummary:
-        if pokemon.species.name == "Unown":
-            species_index = 20100 + get_unown_index_by_letter(pokemon.unown_letter)
-        else:
-            species_index = pokemon.species.index
-
+        species_index = pokemon.species_id_for_stats
         if species_index in self.encounter_summaries:
             return self.encounter_summaries[species_index]
         else:
             return EncounterSummary(
                 species=pokemon.species,
-                species_form=pokemon.unown_letter if pokemon.species.name == "Unown" else None,
+                species_form=pokemon.unown_letter if pokemon.species.index == _unown_species_index else None,
                 total_encounters=0,
                 shiny_encounters=0,
                 catches=0,
@@ -530,6 +591,9 @@ class GlobalStats:
             )
 
     def to_dict(self):
+        if self._dict is not None:
+            return self._dict
+
         phase = (
             ShinyPhase(0, datetime.now(timezone.utc)) if self.current_shiny_phase is None else self.current_shiny_phase
         )
@@ -537,7 +601,7 @@ class GlobalStats:
         longest_shiny_phase = phase if self.longest_shiny_phase is None else self.longest_shiny_phase
         shortest_shiny_phase = phase if self.shortest_shiny_phase is None else self.shortest_shiny_phase
 
-        return {
+        result = {
             "pokemon": {summary.species_name: summary.to_dict() for summary in self.encounter_summaries.values()},
             "totals": self.totals.to_dict(),
             "current_phase": {
@@ -574,3 +638,9 @@ class GlobalStats:
             },
             "pickup_items": {entry.item.name: entry.times_picked_up for entry in self.pickup_items.values()},
         }
+
+        # Without a current phase, the output contains the current time, so it must not be reused.
+        if self.current_shiny_phase is not None:
+            self._dict = result
+
+        return result
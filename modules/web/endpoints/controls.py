@@ -4,9 +4,15 @@ from aiohttp import web
 from modules.core.context import context
 from modules.game.libmgba import inputs_to_strings
 from modules.core.main import work_queue
+from modules.web.state import json_response
 
 route = web.RouteTableDef()
 
+# Button names are accepted case-insensitively, so this maps the lowercase name to the one the emulator uses.
+_buttons_by_lowercase_name = {
+    button.lower(): button for button in ("A", "B", "Select", "Start", "Right", "Left", "Up", "Down", "R", "L")
+}
+
 
 @route.get("/input")
 async def http_get_input(request: web.Request):
@@ -21,7 +27,7 @@ async def http_get_input(request: web.Request):
       tags:
         - emulator
     """
-    return web.json_response(inputs_to_strings(context.emulator.get_inputs()))
+    return json_response(inputs_to_strings(context.emulator.get_inputs()))
 
 
 @route.post("/input")
@@ -53,12 +59,15 @@ async def http_post_input(request: web.Request):
     if not isinstance(new_buttons, list):
         return web.Response(text="This endpoint expects a JSON array as its payload.", status=422)
 
-    possible_buttons = ["A", "B", "Select", "Start", "Right", "Left", "Up", "Down", "R", "L"]
+    if not all(isinstance(button, str) for button in new_buttons):
+        return web.Response(text="This endpoint expects a JSON array of button names as its payload.", status=422)
+
     buttons_to_press = []
     for button in new_buttons:
-        for possible_button in possible_buttons:
-            if button.lower() == possible_button.lower():
-                buttons_to_press.append(possible_button)
+        button_name = _buttons_by_lowercase_name.get(button.lower())
+        if button_name is None:
+            return web.Response(text=f"Unrecognised button: '{button}'.", status=422)
+        buttons_to_press.append(button_name)
 
     def update_inputs():
         if context.bot_mode == "Manual":
@@ -3,9 +3,12 @@ from aiohttp import web
 
 from modules.core.context import context
 from modules.modes import get_bot_mode_names
+from modules.web.state import json_response
 
 route = web.RouteTableDef()
 
+_valid_emulation_speeds = (0, 1, 2, 3, 4, 8, 16, 32)
+
 
 @route.get("/fps")
 async def http_get_fps(request: web.Request):
@@ -22,9 +25,9 @@ async def http_get_fps(request: web.Request):
     """
 
     if context.emulator is None:
-        return web.json_response(None)
+        return json_response(None)
     else:
-        return web.json_response(list(reversed(context.emulator._performance_tracker.fps_history)))
+        return json_response(list(reversed(context.emulator._performance_tracker.fps_history)))
 
 
 @route.get("/bot_modes")
@@ -40,7 +43,7 @@ async def http_get_bot_modes(request: web.Request):
       tags:
         - emulator
     """
-    return web.json_response(get_bot_mode_names())
+    return json_response(get_bot_mode_names())
 
 
 @route.get("/emulator")
@@ -58,9 +61,9 @@ async def http_get_emulator(request: web.Request):
     """
 
     if context.emulator is None:
-        return web.json_response(None)
+        return json_response(None)
     else:
-        return web.json_response(
+        return json_response(
             {
                 "emulation_speed": context.emulation_speed,
                 "video_enabled": context.video,
@@ -119,16 +122,17 @@ async def http_post_emulator(request: web.Request):
 
     for key in new_settings:
         if key == "emulation_speed":
-            if new_settings["emulation_speed"] not in [0, 1, 2, 3, 4, 8, 16, 32]:
+            if new_settings["emulation_speed"] not in _valid_emulation_speeds:
                 return web.Response(
                     text=f"Setting `emulation_speed` contains an invalid value ('{new_settings['emulation_speed']}')",
                     status=422,
                 )
             context.emulation_speed = new_settings["emulation_speed"]
         elif key == "bot_mode":
-            if new_settings["bot_mode"] not in get_bot_mode_names():
+            bot_mode_names = get_bot_mode_names()
+            if new_settings["bot_mode"] not in bot_mode_names:
                 return web.Response(
-                    text=f"Setting `bot_mode` contains an invalid value ('{new_settings['bot_mode']}'). Possible values are: {', '.join(get_bot_mode_names())}",
+                    text=f"Setting `bot_mode` contains an invalid value ('{new_settings['bot_mode']}'). Possible values are: {', '.join(bot_mode_names)}",
                     status=422,
                 )
             context.bot_mode = new_settings["bot_mode"]
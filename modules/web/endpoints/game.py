@@ -2,8 +2,8 @@
 from aiohttp import web
 
 from modules.game.game import _event_flags
-from modules.game.memory import get_event_flag, get_game_state
-from modules.web.state import custom_state
+from modules.game.memory import get_all_event_flags, get_event_flag, get_game_state
+from modules.web.state import custom_state, json_response
 
 route = web.RouteTableDef()
 
@@ -25,7 +25,7 @@ async def http_get_game_state(request: web.Request):
     if game_state is not None:
         game_state = game_state.name
 
-    return web.json_response(game_state)
+    return json_response(game_state)
 
 
 @route.get("/custom_state")
@@ -43,7 +43,7 @@ async def http_get_custom_state(request: web.Request):
       tags:
         - stats
     """
-    return web.json_response(custom_state)
+    return json_response(custom_state)
 
 
 @route.get("/event_flags")
@@ -70,10 +70,6 @@ async def http_get_event_flags(request: web.Request):
     flag = request.query.getone("flag", None)
 
     if flag and flag in _event_flags:
-        return web.json_response({flag: get_event_flag(flag)})
-    result = {}
+        return json_response({flag: get_event_flag(flag)})
 
-    for flag in _event_flags:
-        result[flag] = get_event_flag(flag)
-
-    return web.json_response(result)
+    return json_response(get_all_event_flags())
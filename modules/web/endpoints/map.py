@@ -1,15 +1,45 @@
 # Copyright (c) 2026 realgarit
+from functools import lru_cache
+
 from aiohttp import web
 
 from modules.core.context import context
-from modules.map.map import get_effective_encounter_rates_for_current_map, get_map_data
+from modules.map.map import ObjectEventTemplate, get_effective_encounter_rates_for_current_map, get_map_data
 from modules.map.map_data import MapFRLG, MapRSE
 from modules.player.player import get_player_avatar
 from modules.core.state_cache import state_cache
-from modules.web.state import _update_via_work_queue
+from modules.web.state import _update_via_work_queue, encode_json_with_etag, encoded_json_response, json_response
 
 route = web.RouteTableDef()
 
+_valid_maps_rse = frozenset(map_enum.value for map_enum in MapRSE)
+_valid_maps_frlg = frozenset(map_enum.value for map_enum in MapFRLG)
+
+
+@lru_cache(maxsize=64)
+def _get_trainer_objects(rom_id: str, map_group: int, map_number: int) -> tuple[ObjectEventTemplate, ...]:
+    map_data = get_map_data((map_group, map_number), local_position=(0, 0))
+    return tuple(
+        template for template in map_data.objects if template.kind == "normal" and template.trainer_type != "None"
+    )
+
+
+@lru_cache(maxsize=64)
+def _get_encoded_map(
+    rom_id: str, map_group: int, map_number: int, defeated_trainers: tuple[bool, ...]
+) -> tuple[bytes, str]:
+    # Map layouts are read from ROM and never change, so the encoded response can be reused.
+    # The ROM ID is only part of the key so that a different ROM does not get served stale data.
+    # The only part of the response that comes from the save game is whether the map's trainers
+    # have been defeated, so their event flags are part of the key as well.
+    map_data = get_map_data((map_group, map_number), local_position=(0, 0))
+    return encode_json_with_etag(
+        {
+            "map": map_data.dict_for_map(),
+            "tiles": map_data.dicts_for_all_tiles(),
+        }
+    )
+
 
 @route.get("/map")
 async def http_get_map(request: web.Request):
@@ -26,7 +56,7 @@ async def http_get_map(request: web.Request):
     """
 
     cached_avatar = state_cache.player_avatar
-    _update_via_work_queue(cached_avatar, get_player_avatar)
+    await _update_via_work_queue(cached_avatar, get_player_avatar)
 
     if cached_avatar.value is not None:
         try:
@@ -41,7 +71,7 @@ async def http_get_map(request: web.Request):
     else:
         data = None
 
-    return web.json_response(data)
+    return json_response(data)
 
 
 @route.get("/map_encounters")
@@ -61,9 +91,9 @@ async def http_get_map_encounters(request: web.Request):
     """
 
     effective_encounters = state_cache.effective_wild_encounters
-    _update_via_work_queue(effective_encounters, get_effective_encounter_rates_for_current_map)
+    await _update_via_work_queue(effective_encounters, get_effective_encounter_rates_for_current_map)
 
-    return web.json_response(effective_encounters.value.to_dict())
+    return json_response(effective_encounters.value.to_dict())
 
 
 @route.get("/map/{map_group:\\d+}/{map_number:\\d+}")
@@ -97,16 +127,10 @@ async def http_get_map_by_group_and_number(request: web.Request):
 
     map_group = int(request.match_info["map_group"])
     map_number = int(request.match_info["map_number"])
-    maps_enum = MapRSE if context.rom.is_rse else MapFRLG
-    try:
-        maps_enum((map_group, map_number))
-    except ValueError:
+    valid_maps = _valid_maps_rse if context.rom.is_rse else _valid_maps_frlg
+    if (map_group, map_number) not in valid_maps:
         return web.Response(text=f"No such map: {map_group}, {map_number}", status=404)
 
-    map_data = get_map_data((map_group, map_number), local_position=(0, 0))
-    return web.json_response(
-        {
-            "map": map_data.dict_for_map(),
-            "tiles": map_data.dicts_for_all_tiles(),
-        }
-    )
+    trainer_objects = _get_trainer_objects(context.rom.id, map_group, map_number)
+    defeated_trainers = tuple(trainer.is_trainer_defeated for trainer in trainer_objects)
+    return encoded_json_response(request, *_get_encoded_map(context.rom.id, map_group, map_number, defeated_trainers))
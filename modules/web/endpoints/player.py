@@ -4,7 +4,7 @@ from aiohttp import web
 from modules.items.items import get_item_bag
 from modules.player.player import get_player, get_player_avatar
 from modules.core.state_cache import state_cache
-from modules.web.state import _update_via_work_queue
+from modules.web.state import _update_via_work_queue, json_response
 
 route = web.RouteTableDef()
 
@@ -27,10 +27,10 @@ async def http_get_player(request: web.Request):
     def do_update():
         get_player()
 
-    _update_via_work_queue(state_cache.player, do_update)
+    await _update_via_work_queue(state_cache.player, do_update)
 
     if state_cache.player.value:
-        return web.json_response(
+        return json_response(
             {
                 "name": state_cache.player.value.name,
                 "gender": state_cache.player.value.gender,
@@ -45,7 +45,7 @@ async def http_get_player(request: web.Request):
                 ),
             }
         )
-    return web.json_response(None)
+    return json_response(None)
 
 
 @route.get("/player/avatar")
@@ -65,11 +65,11 @@ async def http_get_player_avatar(request: web.Request):
     def do_update():
         get_player_avatar()
 
-    _update_via_work_queue(state_cache.player_avatar, do_update, maximum_age_in_frames=1)
+    await _update_via_work_queue(state_cache.player_avatar, do_update, maximum_age_in_frames=1)
 
     if state_cache.player_avatar.value:
-        return web.json_response(state_cache.player_avatar.value.to_dict())
-    return web.json_response(None)
+        return json_response(state_cache.player_avatar.value.to_dict())
+    return json_response(None)
 
 
 @route.get("/bag")
@@ -89,8 +89,8 @@ async def http_get_bag(request: web.Request):
     def do_update():
         get_item_bag()
 
-    _update_via_work_queue(state_cache.item_bag, do_update)
+    await _update_via_work_queue(state_cache.item_bag, do_update)
 
     if state_cache.item_bag.value:
-        return web.json_response(state_cache.item_bag.value.to_dict())
-    return web.json_response(None)
+        return json_response(state_cache.item_bag.value.to_dict())
+    return json_response(None)
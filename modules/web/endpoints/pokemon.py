@@ -5,12 +5,16 @@ from modules.pokemon.daycare import get_daycare_data
 from modules.game.memory import GameState
 from modules.pokemon.pokedex import get_pokedex
 from modules.pokemon.pokemon_party import get_party
-from modules.pokemon.pokemon_storage import get_pokemon_storage
+from modules.pokemon.pokemon_storage import PokemonStorage, get_pokemon_storage
 from modules.core.state_cache import state_cache
-from modules.web.state import _update_via_work_queue
+from modules.web.state import _update_via_work_queue, encode_json_with_etag, encoded_json_response, json_response
 
 route = web.RouteTableDef()
 
+# The state cache only replaces the storage object if the data has actually changed,
+# so the object itself tells us whether a previously encoded response is still valid.
+_encoded_pokemon_storage: dict[str, tuple[PokemonStorage, bytes, str]] = {}
+
 
 @route.get("/party")
 async def http_get_party(request: web.Request):
@@ -26,9 +30,9 @@ async def http_get_party(request: web.Request):
         - pokemon
     """
     cached_party = state_cache.party
-    _update_via_work_queue(cached_party, get_party)
+    await _update_via_work_queue(cached_party, get_party)
 
-    return web.json_response(cached_party.value.to_list())
+    return json_response(cached_party.value.to_list())
 
 
 @route.get("/pokedex")
@@ -47,9 +51,9 @@ async def http_get_pokedex(request: web.Request):
 
     cached_pokedex = state_cache.pokedex
     if cached_pokedex.age_in_seconds > 1:
-        _update_via_work_queue(cached_pokedex, get_pokedex)
+        await _update_via_work_queue(cached_pokedex, get_pokedex)
 
-    return web.json_response(cached_pokedex.value.to_dict())
+    return encoded_json_response(request, *encode_json_with_etag(cached_pokedex.value.to_dict()))
 
 
 @route.get("/pokemon_storage")
@@ -76,17 +80,26 @@ async def http_get_pokemon_storage(request: web.Request):
     """
 
     cached_storage = state_cache.pokemon_storage
-    _update_via_work_queue(cached_storage, get_pokemon_storage)
+    await _update_via_work_queue(cached_storage, get_pokemon_storage)
+
+    storage = cached_storage.value
+    response_format = "size-only" if request.query.get("format") == "size-only" else "full"
+    if response_format in _encoded_pokemon_storage and _encoded_pokemon_storage[response_format][0] is storage:
+        _, encoded_response, etag = _encoded_pokemon_storage[response_format]
+        return encoded_json_response(request, encoded_response, etag)
 
-    if "format" in request.query and request.query.getone("format") == "size-only":
-        return web.json_response(
+    if response_format == "size-only":
+        encoded_response, etag = encode_json_with_etag(
             {
-                "pokemon_stored": cached_storage.value.pokemon_count,
-                "boxes": [len(box.slots) for box in cached_storage.value.boxes],
+                "pokemon_stored": storage.pokemon_count,
+                "boxes": [len(box.slots) for box in storage.boxes],
             }
         )
     else:
-        return web.json_response(cached_storage.value.to_dict())
+        encoded_response, etag = encode_json_with_etag(storage.to_dict())
+
+    _encoded_pokemon_storage[response_format] = (storage, encoded_response, etag)
+    return encoded_json_response(request, encoded_response, etag)
 
 
 @route.get("/daycare")
@@ -102,7 +115,7 @@ async def http_get_daycare(request: web.Request):
       tags:
         - pokemon
     """
-    return web.json_response(get_daycare_data().to_dict())
+    return json_response(get_daycare_data().to_dict())
 
 
 @route.get("/opponent")
@@ -128,4 +141,4 @@ async def http_get_opponent(request: web.Request):
         else:
             result = None
 
-    return web.json_response(result)
+    return json_response(result)
@@ -1,13 +1,15 @@
 # Copyright (c) 2026 realgarit
 import asyncio
-import queue
 import time
 from queue import Queue
+from threading import Thread
 from typing import Union
 
+import numpy
 from aiohttp import web
 
 from modules.core.context import context
+from modules.web.state import json_response
 
 try:
     from aiortc import MediaStreamTrack, VideoStreamTrack, RTCPeerConnection, RTCSessionDescription
@@ -27,11 +29,22 @@ if webrtc_available:
     class EmuVideo(VideoStreamTrack):
         def __init__(self):
             super().__init__()
+            self._last_frame_count: int = -1
+            self._last_screen: numpy.ndarray | None = None
 
         async def recv(self) -> Union[Frame, Packet]:
             pts, time_base = await self.next_timestamp()
 
-            frame = VideoFrame.from_image(context.emulator.get_current_screen_image())
+            # The track may ask for frames more often than the emulator produces them (e.g. when
+            # the emulator is paused), in which case the last screen contents can be reused.
+            frame_count = context.emulator.get_frame_count()
+            if frame_count != self._last_frame_count:
+                self._last_screen = numpy.asarray(context.emulator.get_current_screen_image().convert("RGB"))
+                self._last_frame_count = frame_count
+
+            # Each call gets its own frame object because the relay hands it to all peers, whose
+            # encoders may still be working on the previous frame.
+            frame = VideoFrame.from_ndarray(self._last_screen, format="rgb24")
             frame.pts = pts
             frame.time_base = time_base
 
@@ -43,19 +56,35 @@ if webrtc_available:
         def __init__(self):
             super().__init__()
             self._queue: Queue[bytes] = context.emulator.get_last_audio_data()
+            self._async_queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=self._queue.maxsize)
             self._start: float | None = None
             self._timestamp: float = 0
 
+            # Audio data is produced by the emulator thread, so a separate thread waits for it
+            # and passes it to the event loop. That way, `recv()` does not have to poll for it.
+            loop = asyncio.get_running_loop()
+            Thread(target=self._forward_audio_data, args=(loop,), daemon=True).start()
+
+        def _forward_audio_data(self, loop: asyncio.AbstractEventLoop) -> None:
+            while True:
+                part = self._queue.get()
+                if len(part) == 0:
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self._add_audio_data, part)
+                except RuntimeError:
+                    # The HTTP server's event loop has been closed.
+                    return
+
+        def _add_audio_data(self, part: bytes) -> None:
+            # Like the emulator's own queue, drop the oldest audio data if nobody is consuming it.
+            if self._async_queue.full():
+                self._async_queue.get_nowait()
+            self._async_queue.put_nowait(part)
+
         async def recv(self) -> Union[Frame, Packet]:
             sample_rate = context.emulator.get_sample_rate()
-            data = b""
-            while len(data) == 0:
-                try:
-                    part = self._queue.get_nowait()
-                except queue.Empty:
-                    await asyncio.sleep(1 / 480)
-                    continue
-                data += part
+            data = await self._async_queue.get()
 
             if self._start is None:
                 self._start = time.time()
@@ -110,7 +139,7 @@ if webrtc_available:
         answer = await connection.createAnswer()
         await connection.setLocalDescription(answer)
 
-        return web.json_response({"sdp": connection.localDescription.sdp, "type": connection.localDescription.type})
+        return json_response({"sdp": connection.localDescription.sdp, "type": connection.localDescription.type})
 
 else:
 
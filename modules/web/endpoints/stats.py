@@ -1,7 +1,10 @@
 # Copyright (c) 2026 realgarit
+import asyncio
+
 from aiohttp import web
 
 from modules.core.context import context
+from modules.web.state import encode_json, json_response
 
 route = web.RouteTableDef()
 
@@ -20,7 +23,12 @@ async def http_get_encounter_log(request: web.Request):
         - stats
     """
 
-    return web.json_response([pokemon.to_dict() for pokemon in context.stats.get_encounter_log()])
+    # Querying the stats database can take a moment on a slow disk, so this runs on an executor
+    # thread rather than blocking the event loop.
+    def get_encounter_log() -> list[dict]:
+        return [pokemon.to_dict() for pokemon in context.stats.get_encounter_log()]
+
+    return json_response(await asyncio.get_running_loop().run_in_executor(None, get_encounter_log))
 
 
 @route.get("/shiny_log")
@@ -37,7 +45,14 @@ async def http_get_shiny_log(request: web.Request):
         - stats
     """
 
-    return web.json_response([phase.to_dict() for phase in context.stats.get_shiny_log()])
+    # The shiny log can get quite long, so rather than building a dict for every phase first and then
+    # encoding the whole list, each phase is encoded on its own so that only one dict exists at a time.
+    def encode_shiny_log() -> bytes:
+        return b",".join(encode_json(phase.to_dict()) for phase in context.stats.get_shiny_log())
+
+    # Like the encounter log, this queries the stats database and so must not block the event loop.
+    encoded_phases = await asyncio.get_running_loop().run_in_executor(None, encode_shiny_log)
+    return web.Response(body=b"[" + encoded_phases + b"]", content_type="application/json")
 
 
 @route.get("/encounter_rate")
@@ -54,7 +69,7 @@ async def http_get_encounter_rate(request: web.Request):
         - stats
     """
 
-    return web.json_response({"encounter_rate": context.stats.encounter_rate})
+    return json_response({"encounter_rate": context.stats.encounter_rate})
 
 
 @route.get("/stats")
@@ -71,4 +86,4 @@ async def http_get_stats(request: web.Request):
         - stats
     """
 
-    return web.json_response(context.stats.get_global_stats().to_dict())
+    return json_response(context.stats.get_global_stats().to_dict())
@@ -11,6 +11,28 @@ from modules.web.http_stream import add_subscriber
 
 route = web.RouteTableDef()
 
+_video_frame_header = b"\r\n--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+_encoded_video_frame: tuple[int, bytes] | None = None
+
+
+def _get_encoded_video_frame() -> tuple[int, bytes]:
+    """
+    Encodes the current screen content as JPEG. The result is shared between all clients
+    of the video stream, so every frame only gets encoded once regardless of how many
+    clients are connected (and not at all if there are none.)
+
+    :return: Tuple of the frame number and the JPEG-encoded image.
+    """
+    global _encoded_video_frame
+    frame_count = context.emulator.get_frame_count()
+    if _encoded_video_frame is None or _encoded_video_frame[0] != frame_count:
+        jpeg_data = io.BytesIO()
+        context.emulator.get_current_screen_image().convert("RGB").save(
+            jpeg_data, format="JPEG", quality=90, subsampling=0
+        )
+        _encoded_video_frame = (frame_count, jpeg_data.getvalue())
+    return _encoded_video_frame
+
 
 @route.get("/stream_events")
 async def http_get_events_stream(request: web.Request):
@@ -32,13 +54,16 @@ async def http_get_events_stream(request: web.Request):
         await response.write(b"retry: 2500\n\n")
         while True:
             await new_message_event.wait()
+            # All messages that are waiting get sent in a single write, rather than one write per message.
+            messages = bytearray()
             try:
                 while True:
-                    message = message_queue.get(block=False)
-                    await response.write(str.encode(message) + b"\n\n")
+                    messages += str.encode(message_queue.get(block=False)) + b"\n\n"
             except queue.Empty:
                 pass
             new_message_event.clear()
+            if len(messages) > 0:
+                await response.write(messages)
     except GeneratorExit:
         await response.write_eof()
     except aiohttp.client_exceptions.ClientError:
@@ -80,14 +105,16 @@ async def http_get_video_stream(request: web.Request):
     await response.prepare(request)
 
     sleep_after_frame = 1 / fps
-    png_data = io.BytesIO()
+    last_frame_count = None
     try:
         while True:
+            # If the emulator has not produced a new frame since the last one we sent (e.g. because
+            # it is paused or running slower than the requested FPS), there is nothing to send.
             if context.video:
-                png_data.seek(0)
-                context.emulator.get_current_screen_image().convert("RGB").save(png_data, format="PNG")
-                png_data.seek(0)
-                await response.write(b"\r\n--frame\r\nContent-Type: image/png\r\n\r\n" + png_data.read())
+                frame_count, jpeg_data = _get_encoded_video_frame()
+                if frame_count != last_frame_count:
+                    last_frame_count = frame_count
+                    await response.write(_video_frame_header + jpeg_data)
             await asyncio.sleep(sleep_after_frame)
     except aiohttp.client_exceptions.ClientError:
         pass
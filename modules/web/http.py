@@ -1,6 +1,7 @@
 # Copyright (c) 2026 realgarit
 import asyncio
 import re
+from functools import lru_cache
 from threading import Thread
 
 from aiohttp import web
@@ -20,6 +21,10 @@ from modules.web.endpoints.rtc import route as rtc_route
 from modules.web.endpoints.stats import route as stats_route
 from modules.web.endpoints.stream import route as stream_route
 from modules.web.state import custom_state  # noqa: F401
+from modules.web.state import encode_json_with_etag, encoded_json_response
+
+# Turns aiohttp's route placeholders with a regex (`{name:regex}`) into plain OpenAPI placeholders (`{name}`.)
+_route_placeholder_regex = re.compile("\\{([_a-zA-Z0-9]+)(:[^}]*)?}")
 
 
 def http_server(host: str, port: int) -> web.AppRunner:
@@ -64,16 +69,24 @@ def http_server(host: str, port: int) -> web.AppRunner:
     for route_def in all_routes:
         for api_route in route_def:
             if isinstance(api_route, web.RouteDef):
-                path = re.sub("\\{([_a-zA-Z0-9]+)(:[^}]*)?}", "{\\1}", api_route.path)
+                path = _route_placeholder_regex.sub("{\\1}", api_route.path)
                 operations = load_operations_from_docstring(api_route.handler.__doc__)
                 spec.path(path=path, operations=operations)
 
+    # The documented routes do not change after this point, so the spec only needs to be built once.
+    # Only the server URL depends on the request.
+    api_docs = spec.to_dict()
+
+    # The encoded spec is kept for the few host names that the server is likely to be reached by.
+    @lru_cache(maxsize=8)
+    def get_encoded_api_docs(request_host: str) -> tuple[bytes, str]:
+        return encode_json_with_etag(
+            {**api_docs, "servers": [{**api_docs["servers"][0], "url": f"http://{request_host}"}]}
+        )
+
     # From here on out, any additional routes will NOT be documented in Swagger.
     async def http_get_api_json(request: web.Request):
-        api_docs = spec.to_dict()
-        api_docs["servers"][0]["url"] = f"http://{request.headers['host']}"
-
-        return web.json_response(api_docs)
+        return encoded_json_response(request, *get_encoded_api_docs(request.headers["host"]))
 
     server = web.Application()
     for route_def in all_routes:
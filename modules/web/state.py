@@ -1,13 +1,103 @@
 # Copyright (c) 2026 realgarit
+import asyncio
+import hashlib
+
+import orjson
+from aiohttp import web
+
 from modules.core.console import console
+from modules.core.context import context
 from modules.core.main import work_queue
 from modules.core.state_cache import StateCacheItem
 
 custom_state: dict = {}
 
+# Updates that have been requested but not executed yet, keyed by the ID of the state
+# cache entry they are updating.
+_pending_updates: dict[int, asyncio.Future] = {}
+
+# Update callbacks that have been requested during the current iteration of the event
+# loop and that have not been submitted to the work queue yet.
+_update_batch: dict[int, callable] = {}
+
+# If an update fails (typically because the game is in a state where that data cannot be
+# read, such as the title screen), no further attempts are made for that state cache entry
+# for a while. This maps the entry's ID to the frame of the last failure and the number
+# of frames to wait, which doubles with every consecutive failure.
+_failed_updates: dict[int, tuple[int, int]] = {}
+_maximum_frames_to_wait_after_failed_update = 60
+
+# How long a request will wait for the main thread to update a state cache entry before
+# it gives up and uses the existing (possibly outdated) data instead.
+_seconds_to_wait_for_update = 1
+
+_orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def json_response(data: any, status: int = 200) -> web.Response:
+    """
+    Drop-in replacement for `web.json_response()` that encodes the payload with `orjson`
+    rather than the standard library's `json` module, which is a lot faster for the big
+    responses (map data, PC storage, event flags, ...).
+
+    :param data: The data to be returned as JSON.
+    :param status: HTTP status code of the response.
+    :return: A response object with the encoded data as its body.
+    """
+    return web.Response(body=encode_json(data), status=status, content_type="application/json")
+
 
-def _update_via_work_queue(
-    state_cache_entry: StateCacheItem, update_callback: callable, maximum_age_in_frames: int = 5
+def encode_json(data: any) -> bytes:
+    """
+    Encodes data the same way as `json_response()` does, so that endpoints can keep
+    an already-encoded response around and serve it again.
+
+    :param data: The data to encode.
+    :return: UTF-8 encoded JSON.
+    """
+    return orjson.dumps(data, option=_orjson_options)
+
+
+def encode_json_with_etag(data: any) -> tuple[bytes, str]:
+    """
+    Encodes data like `encode_json()` does and also derives an ETag from the result.
+    Endpoints that keep an encoded response around should keep the ETag along with it,
+    so that it does not need to be worked out again for every request.
+
+    :param data: The data to encode.
+    :return: Tuple of the UTF-8 encoded JSON and its ETag.
+    """
+    encoded_data = encode_json(data)
+    return encoded_data, hashlib.blake2b(encoded_data, digest_size=16).hexdigest()
+
+
+def encoded_json_response(request: web.Request, encoded_data: bytes, etag: str) -> web.Response:
+    """
+    Returns already-encoded JSON data along with its ETag. If the client already has that
+    exact data (i.e. it sent a matching `If-None-Match` header), it gets an empty
+    `304 Not Modified` response instead.
+
+    :param request: The request that is being answered.
+    :param encoded_data: UTF-8 encoded JSON, as returned by `encode_json_with_etag()`.
+    :param etag: The ETag of `encoded_data`, as returned by `encode_json_with_etag()`.
+    :return: A response object.
+    """
+    if any(client_etag.value == etag for client_etag in request.if_none_match or ()):
+        response = web.Response(status=304)
+    else:
+        response = web.Response(body=encoded_data, content_type="application/json")
+
+    # `no-cache` means that the client may keep the data, but has to check with us before using it.
+    response.etag = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+async def _update_via_work_queue(
+    state_cache_entry: StateCacheItem,
+    update_callback: callable,
+    maximum_age_in_frames: int = 5,
+    maximum_stale_age_in_frames: int | None = None,
 ) -> None:
     """
     Ensures that an entry in the State cache is up-to-date.
@@ -22,9 +112,18 @@ def _update_via_work_queue(
     The work queue is just a list of callbacks that the main thread will execute
     after the current frame is emulated.
 
+    While waiting for the main thread, other requests can still be handled. If one of
+    them needs the same state cache entry, it will wait for the update that has already
+    been submitted rather than queueing another one.
+
+    If the data is only slightly outdated, or if the main thread does not get around to
+    running the update within a second, the request will use the existing data instead
+    of waiting for the update.
+
     Because these data-updating callbacks might fail anyway (due to the game being in
     a weird state or something like that), this function will just ignore these errors
-    and pretend that the data has been updated.
+    and pretend that the data has been updated. After a failed update, no new attempts
+    will be made for a few frames (doubling with each further failure, up to a second.)
 
     This means that the HTTP API will potentially return some outdated data, but it's
     just a reporting tool anyway.
@@ -35,21 +134,85 @@ def _update_via_work_queue(
                                   be considered up-to-date. If the data is 'younger'
                                   than or equal to that number of frames, this function
                                   will do nothing.
+    :param maximum_stale_age_in_frames: Data that is older than `maximum_age_in_frames` but
+                                        not older than this will be used as it is, while an
+                                        update is requested in the background. Defaults to
+                                        twice `maximum_age_in_frames`.
     """
-    if state_cache_entry.age_in_frames < maximum_age_in_frames:
+    age_in_frames = state_cache_entry.age_in_frames
+    if age_in_frames < maximum_age_in_frames:
+        return
+
+    if maximum_stale_age_in_frames is None:
+        maximum_stale_age_in_frames = 2 * maximum_age_in_frames
+
+    key = id(state_cache_entry)
+    if key in _failed_updates:
+        failed_at_frame, frames_to_wait = _failed_updates[key]
+        # The frame count going backwards means that the emulator has been reset.
+        if 0 <= context.emulator.get_frame_count() - failed_at_frame < frames_to_wait:
+            return
+
+    if key not in _pending_updates:
+        loop = asyncio.get_running_loop()
+        if len(_update_batch) == 0:
+            loop.call_soon(_submit_update_batch, loop)
+        _update_batch[key] = update_callback
+        _pending_updates[key] = loop.create_future()
+
+    if age_in_frames < maximum_stale_age_in_frames:
         return
 
-    def do_update():
+    # The update is shielded so that a client disconnecting (which cancels its request handler)
+    # does not cancel the update for other requests that are waiting for it too.
+    try:
+        await asyncio.wait_for(asyncio.shield(_pending_updates[key]), timeout=_seconds_to_wait_for_update)
+    except TimeoutError:
+        # The main thread is busy with something else (or paused), so just serve what we have.
+        pass
+
+
+def _submit_update_batch(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Submits all updates that have been requested during this iteration of the event loop
+    as a single item to the work queue, so that a client fetching several endpoints at
+    once only costs one round-trip to the main thread.
+
+    :param loop: The HTTP server's event loop.
+    """
+    batch = _update_batch.copy()
+    _update_batch.clear()
+
+    def mark_as_done(failed_keys: list[int]):
+        for key in batch:
+            if key in failed_keys:
+                frames_to_wait = _failed_updates[key][1] * 2 if key in _failed_updates else 1
+                _failed_updates[key] = (
+                    context.emulator.get_frame_count(),
+                    min(frames_to_wait, _maximum_frames_to_wait_after_failed_update),
+                )
+            elif key in _failed_updates:
+                del _failed_updates[key]
+            _pending_updates.pop(key).set_result(None)
+
+    def do_updates():
+        failed_keys = []
+        for key, update_callback in batch.items():
+            try:
+                update_callback()
+            except Exception:
+                # We don't want to spam the console with errors if the game is in a weird state
+                # console.print_exception()
+                failed_keys.append(key)
+
         try:
-            update_callback()
-        except Exception:
-            # We don't want to spam the console with errors if the game is in a weird state
-            # console.print_exception()
+            loop.call_soon_threadsafe(mark_as_done, failed_keys)
+        except RuntimeError:
+            # The HTTP server's event loop has already been closed.
             pass
 
     try:
-        work_queue.put_nowait(do_update)
-        work_queue.join()
+        work_queue.put_nowait(do_updates)
     except Exception:
         console.print_exception()
-        return
+        mark_as_done([])
@@ -250,6 +250,8 @@ export type Pokemon = {
 
     species_name_for_stats: string;
 
+    species_id_for_stats: number;
+
     held_item: Item | null;
 
     // Total number of Experience that this Pokémon has collected.
@@ -14,17 +14,27 @@ from modules.core.version import realbot_name, realbot_version
 
 OS_NAME = platform.system()
 gui = None
+parent_process_name: str | None = None
 
 
 # If you're on Windows and just double-click this file, the terminal usually closes right away if things crash.
 # That makes it hard to see what went wrong. So we'll wait for a key press before it shuts down.
 def on_exit() -> None:
-    if OS_NAME == "Windows":
-        import psutil
-        import os
-
-        parent_process_name = psutil.Process(os.getppid()).name()
-        if parent_process_name == "py.exe" or is_bundled_app():
+    # Without an interactive console (e.g. when input is redirected, or for the windowed
+    # build that has no console at all) there is nobody who could press a key.
+    if OS_NAME == "Windows" and sys.stdin is not None and sys.stdin.isatty():
+        process_name = parent_process_name
+        if process_name is None:
+            # We might be exiting before the start-up code got around to looking this up.
+            import psutil
+
+            try:
+                process_name = psutil.Process(os.getppid()).name()
+            except psutil.Error:
+                # Not being able to tell is treated the same as not having been started by `py.exe`.
+                pass
+
+        if process_name == "py.exe" or is_bundled_app():
             if gui is not None and gui.window is not None:
                 gui.window.withdraw()
 
@@ -34,7 +44,7 @@ def on_exit() -> None:
 atexit.register(on_exit)
 
 
-@dataclass
+@dataclass(slots=True)
 class StartupSettings:
     profile: "Profile | None"
     debug: bool
@@ -54,7 +64,7 @@ def directory_arg(value: str) -> pathlib.Path:
     Checks if a string is a valid, readable directory.
     """
     path_obj = pathlib.Path(value)
-    if not path_obj.is_dir() or not path_obj.exists():
+    if not path_obj.is_dir():
         from modules.core import exceptions
 
         raise exceptions.CriticalDirectoryMissing(value)
@@ -75,7 +85,9 @@ def parse_arguments(bot_mode_names: list[str]) -> StartupSettings:
     parser.add_argument(
         "-s",
         "--emulation-speed",
-        choices=["0", "1", "2", "3", "4", "8", "16", "32"],
+        type=int,
+        choices=[0, 1, 2, 3, 4, 8, 16, 32],
+        default=1,
         help="Initial emulation speed (0 for unthrottled; default: 1)",
     )
     parser.add_argument("-hl", "--headless", action="store_true", help="Run without a GUI, only using the console.")
@@ -105,7 +117,7 @@ def parse_arguments(bot_mode_names: list[str]) -> StartupSettings:
         no_audio=bool(args.no_audio),
         no_theme=bool(args.no_theme),
         use_opengl=bool(args.use_opengl),
-        emulation_speed=int(args.emulation_speed or "1"),
+        emulation_speed=args.emulation_speed,
         always_on_top=bool(args.always_on_top),
         config_path=args.config_path,
     )
@@ -123,7 +135,6 @@ if __name__ == "__main__":
     from modules.modes import get_bot_mode_names
     from modules.core.plugins import load_plugins
     from modules.core.profiles import Profile, profile_directory_exists, load_profile_by_name
-    from updater import run_updater
 
     register_exception_hook()
     load_plugins()
@@ -131,11 +142,22 @@ if __name__ == "__main__":
     # This catches when someone closes the console window on Windows.
     # We need to make sure the emulator saves everything before it's gone.
     if OS_NAME == "Windows":
+        import psutil
         import win32api
 
+        # This is looked up now rather than in `on_exit()`, because by the time we exit
+        # the parent process might already be gone.
+        try:
+            parent_process_name = psutil.Process(os.getppid()).name()
+        except psutil.Error:
+            pass
+
         def win32_signal_handler(signal_type):
-            if signal_type == 2 and context.emulator is not None:
-                context.emulator.shutdown()
+            if signal_type == 2:
+                if context.emulator is not None:
+                    context.emulator.shutdown()
+                if context.stats is not None:
+                    context.stats.close()
 
         win32api.SetConsoleCtrlHandler(win32_signal_handler, True)
     else:
@@ -146,16 +168,21 @@ if __name__ == "__main__":
             plugin_shutdown()
             if context.emulator:
                 context.emulator.shutdown()
+            # `os._exit()` skips the `atexit` handlers, so the stats database has to be closed here
+            # for commits that are still waiting to be written to make it to disk.
+            if context.stats is not None:
+                context.stats.close()
             os._exit(0)
 
-        signal.signal(signal.SIGTERM, signal_handler)
-        signal.signal(signal.SIGHUP, signal_handler)
-        signal.signal(signal.SIGINT, signal_handler)
+        for signal_type in (signal.SIGTERM, signal.SIGHUP, signal.SIGINT):
+            signal.signal(signal_type, signal_handler)
 
     startup_settings = parse_arguments(get_bot_mode_names())
     console.print(f"Starting [bold cyan]{realbot_name} {realbot_version}![/]")
 
     if not is_bundled_app() and not (get_base_path() / ".git").is_dir():
+        from updater import run_updater
+
         run_updater()
 
     if startup_settings.headless:
@@ -30,6 +30,7 @@ required_modules = [
     "darkdetect~=0.8.0",
     "show-in-file-manager~=1.1.4",
     "aiohttp~=3.10.9",
+    "orjson~=3.10.7",
     "aiortc~=1.10.0",
     "ttkbootstrap~=1.10.1",
 ]
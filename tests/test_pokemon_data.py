@@ -0,0 +1,72 @@
+# Copyright (c) 2026 realgarit
+"""
+Unit tests for modules/pokemon/pokemon_data.py
+"""
+
+import pytest
+
+from modules.pokemon.pokemon_data import LevelUpType, StatusCondition
+
+
+@pytest.mark.parametrize(
+    "bitfield, expected_status_condition",
+    [
+        (0, StatusCondition.Healthy),
+        # The lowest 3 bits are the number of turns left to sleep.
+        (1, StatusCondition.Sleep),
+        (3, StatusCondition.Sleep),
+        (7, StatusCondition.Sleep),
+        (1 << 3, StatusCondition.Poison),
+        (1 << 4, StatusCondition.Burn),
+        (1 << 5, StatusCondition.Freeze),
+        (1 << 6, StatusCondition.Paralysis),
+        (1 << 7, StatusCondition.BadPoison),
+        # If several bits are set, the first matching condition in the order above wins.
+        (2 | 1 << 3, StatusCondition.Sleep),
+        (1 << 3 | 1 << 7, StatusCondition.Poison),
+        (1 << 4 | 1 << 6, StatusCondition.Burn),
+        (1 << 5 | 1 << 7, StatusCondition.Freeze),
+        (1 << 6 | 1 << 7, StatusCondition.Paralysis),
+        (0xFF, StatusCondition.Sleep),
+        # Only the lowest 8 bits contain status information.
+        (1 << 8, StatusCondition.Healthy),
+        (0xFF00 | 1 << 4, StatusCondition.Burn),
+    ],
+)
+def test_status_condition_from_bitfield(bitfield: int, expected_status_condition: StatusCondition):
+    assert StatusCondition.from_bitfield(bitfield) is expected_status_condition
+
+
+@pytest.mark.parametrize("status_condition", list(StatusCondition))
+def test_status_condition_to_bitfield(status_condition: StatusCondition):
+    assert StatusCondition.from_bitfield(status_condition.to_bitfield()) is status_condition
+
+
+# Total experience needed for levels 1, 2 and 100, as listed in the game's experience tables.
+_experience_thresholds = {
+    LevelUpType.MediumFast: (1, 8, 1_000_000),
+    LevelUpType.Erratic: (1, 15, 600_000),
+    LevelUpType.Fluctuating: (1, 4, 1_640_000),
+    LevelUpType.MediumSlow: (1, 9, 1_059_860),
+    LevelUpType.Fast: (1, 6, 800_000),
+    LevelUpType.Slow: (1, 10, 1_250_000),
+}
+
+
+@pytest.mark.parametrize(
+    "level_up_type, level, experience",
+    [
+        (level_up_type, level, experience)
+        for level_up_type, thresholds in _experience_thresholds.items()
+        for level, experience in zip((1, 2, 100), thresholds)
+    ],
+)
+def test_experience_thresholds(level_up_type: LevelUpType, level: int, experience: int):
+    assert level_up_type.get_experience_needed_for_level(level) == experience
+    assert level_up_type.get_level_from_total_experience(experience) == level
+    assert level_up_type.get_level_from_total_experience(experience - 1) == level - 1
+
+
+@pytest.mark.parametrize("level_up_type", list(LevelUpType))
+def test_level_is_capped_at_100(level_up_type: LevelUpType):
+    assert level_up_type.get_level_from_total_experience(_experience_thresholds[level_up_type][2] * 2) == 100
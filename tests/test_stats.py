@@ -0,0 +1,302 @@
+# Copyright (c) 2026 realgarit
+"""
+Unit tests for modules/stats/stats.py
+"""
+
+import sqlite3
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from modules.battle.battle_state import BattleOutcome
+from modules.core.context import context
+from modules.core.profiles import Profile
+from modules.game.game import set_character_table
+from modules.game.memory import pack_uint16, unpack_uint16, unpack_uint32
+from modules.game.roms import ROM, ROMLanguage
+from modules.items.fishing import FishingAttempt, FishingResult, FishingRod
+from modules.pokemon.pokemon import get_species_by_name
+from modules.pokemon.pokemon_constants import POKEMON_DATA_SUBSTRUCTS_ORDER
+from modules.pokemon.pokemon_party import PartyPokemon
+from modules.stats import stats
+from modules.stats.stats import StatsDatabase, current_schema_version
+
+# A Level 3 Zigzagoon, the same as `regular_lead` in `test_map.py`
+zigzagoon = bytes(
+    b"\xe3\xbc\xb1\x149\xe9\xca\xb7\xbc\xff\xff\xff\xff\xff\xff\xff\xff\xff\x02\x02\xca\xd9\xe8\xd9\xff\xff\xff\x00\xe6\x81\x00\x00\xc4T{\xa3\xdaE{\xa3\xda&{\xa3\xdaU{\xa3\xdaU{\xa3\xdaU{\xa3\xa8J\xfd\xb27\x0f\x83\x8d\xdaU{\xa3\xfbU+\xa2\xc6UW\xa3\xf9}t\xba\x00\x00\x00\x00\x10\xff'\x00'\x00\x1a\x00\x13\x00\x10\x00\x11\x00\x13\x00"
+)
+
+
+def _with_species(data: bytes, species_index: int) -> bytes:
+    """
+    :return: A copy of the (encrypted) Pokémon data, with the species replaced and the
+             checksum updated accordingly.
+    """
+    data = bytearray(data)
+    personality_value = unpack_uint32(data[0:4])
+    decryption_key = (unpack_uint32(data[4:8]) ^ personality_value) & 0xFFFF
+    # The species is the first value of the 'growth' substructure.
+    offset = 32 + POKEMON_DATA_SUBSTRUCTS_ORDER[personality_value % 24][0] * 12
+    previous_species_index = unpack_uint16(data[offset : offset + 2]) ^ decryption_key
+    data[offset : offset + 2] = pack_uint16(species_index ^ decryption_key)
+    checksum = (unpack_uint16(data[28:30]) + species_index - previous_species_index) & 0xFFFF
+    data[28:30] = pack_uint16(checksum)
+    return bytes(data)
+
+
+class StatsDatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        self.profile_path = Path(self._temporary_directory.name)
+        context.profile = Profile(
+            ROM("", "", "POKEMON EMER", "", ROMLanguage.English, "", 0), self.profile_path, datetime.now()
+        )
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+
+class TestSchemaUpdate(StatsDatabaseTestCase):
+    def _create_version_5_database(self) -> None:
+        connection = sqlite3.connect(self.profile_path / "stats.db")
+        connection.executescript(
+            stats._SCHEMA_V0_SCRIPT
+            + stats._SCHEMA_V1_SCRIPT
+            + stats._SCHEMA_V2_SCRIPT
+            + stats._SCHEMA_V3_SCRIPT
+            + stats._SCHEMA_V4_SCRIPT
+        )
+        connection.execute("INSERT INTO schema_version VALUES (5)")
+        connection.execute("INSERT INTO base_data (data_key, value) VALUES ('test_key', 'test_value')")
+        connection.execute("INSERT INTO pickup_items (item_id, item_name, times_picked_up) VALUES (13, 'Potion', 3)")
+        connection.commit()
+        connection.close()
+
+    def test_update_from_version_5(self):
+        self._create_version_5_database()
+
+        database = StatsDatabase(context.profile)
+        database._wait_for_pending_writes()
+
+        self.assertEqual("test_value", database.get_data("test_key"))
+        self.assertEqual(3, database.get_global_stats().pickup_items[13].times_picked_up)
+
+        connection = sqlite3.connect(self.profile_path / "stats.db")
+        self.assertEqual(current_schema_version, connection.execute("PRAGMA user_version").fetchone()[0])
+        # Older versions of the bot only read this table, so it must still contain the current version
+        # for them to refuse loading the database.
+        self.assertEqual(
+            [(current_schema_version,)], connection.execute("SELECT version FROM schema_version").fetchall()
+        )
+        connection.close()
+
+    def test_new_database(self):
+        StatsDatabase(context.profile)._wait_for_pending_writes()
+
+        connection = sqlite3.connect(self.profile_path / "stats.db")
+        self.assertEqual(current_schema_version, connection.execute("PRAGMA user_version").fetchone()[0])
+        self.assertEqual(
+            [(current_schema_version,)], connection.execute("SELECT version FROM schema_version").fetchall()
+        )
+        connection.close()
+
+    def test_database_too_new(self):
+        StatsDatabase(context.profile)._wait_for_pending_writes()
+        connection = sqlite3.connect(self.profile_path / "stats.db")
+        connection.execute(f"PRAGMA user_version = {current_schema_version + 1}")
+        connection.close()
+
+        with self.assertRaises(stats.StatsDatabaseSchemaTooNew):
+            StatsDatabase(context.profile)
+
+
+class TestBackgroundWriter(StatsDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.database = StatsDatabase(context.profile)
+
+    def _get_base_data_keys(self) -> list[str]:
+        return [row[0] for row in self.database._read_cursor().execute("SELECT data_key FROM base_data ORDER BY 1")]
+
+    def test_commit_is_visible_to_next_read(self):
+        self.database.set_data("key", "value")
+        self.assertEqual(["key"], self._get_base_data_keys())
+
+    def test_nested_transactions_are_written_once(self):
+        with patch.object(self.database, "_write_batches", wraps=self.database._write_batches) as write_batches:
+            with self.database._transaction():
+                self.database.set_data("outer", "1")
+                with self.database._transaction():
+                    self.database.set_data("inner", "2")
+                    self.database.set_data("inner2", "3")
+                # Nothing is handed to the writer before the outermost transaction has finished.
+                self.assertTrue(self.database._write_queue.empty())
+            self.database._wait_for_pending_writes()
+
+        self.assertEqual(1, write_batches.call_count)
+        batches = write_batches.call_args.args[0]
+        self.assertEqual(1, len(batches))
+        self.assertEqual(3, len(batches[0]))
+        self.assertEqual(["inner", "inner2", "outer"], self._get_base_data_keys())
+
+    def test_failed_transaction_is_not_written(self):
+        with self.assertRaises(RuntimeError):
+            with self.database._transaction():
+                self.database.set_data("discarded", "1")
+                raise RuntimeError()
+
+        self.database.set_data("written", "2")
+        self.assertEqual(["written"], self._get_base_data_keys())
+
+    def test_write_batches(self):
+        query = "INSERT INTO base_data (data_key, value) VALUES (?, ?)"
+        # The lock keeps the background writer from using the connection at the same time.
+        with self.database._lock:
+            self.database._write_batches(
+                [
+                    [(query, ("a", "1"), False), (query, ("b", "2"), False)],
+                    [(query, [("c", "3"), ("d", "4")], True)],
+                ]
+            )
+        self.assertEqual(["a", "b", "c", "d"], self._get_base_data_keys())
+
+    def test_reads_from_other_threads_do_not_wait_for_writer(self):
+        self.database.set_data("written", "1")
+        self.database._wait_for_pending_writes()
+
+        writer_may_continue = threading.Event()
+        self.addCleanup(writer_may_continue.set)
+        write_batches = self.database._write_batches
+
+        def slow_write_batches(batches):
+            writer_may_continue.wait()
+            write_batches(batches)
+
+        with patch.object(self.database, "_write_batches", side_effect=slow_write_batches):
+            self.database.set_data("pending", "2")
+
+            # Another thread (such as the web server's) gets the data that has already been written.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                keys_read_by_other_thread = executor.submit(self._get_base_data_keys).result(timeout=5)
+            self.assertEqual(["written"], keys_read_by_other_thread)
+
+            writer_may_continue.set()
+            # The thread that committed the change waits for it to be written.
+            self.assertEqual(["pending", "written"], self._get_base_data_keys())
+
+    def test_close_writes_queued_commits(self):
+        writer_may_continue = threading.Event()
+        self.addCleanup(writer_may_continue.set)
+        write_batches = self.database._write_batches
+
+        def slow_write_batches(batches):
+            writer_may_continue.wait()
+            write_batches(batches)
+
+        writer_thread = self.database._writer_thread
+        with patch.object(self.database, "_write_batches", side_effect=slow_write_batches):
+            for index in range(3):
+                self.database.set_data(f"queued_{index}", str(index))
+            threading.Timer(0.1, writer_may_continue.set).start()
+            self.database.close()
+        self.assertFalse(writer_thread.is_alive())
+
+        # After closing, changes are written right away.
+        self.database.set_data("after_close", "3")
+        self.database.close()
+
+        connection = sqlite3.connect(self.profile_path / "stats.db")
+        self.assertEqual(
+            [("after_close",), ("queued_0",), ("queued_1",), ("queued_2",)],
+            connection.execute("SELECT data_key FROM base_data ORDER BY 1").fetchall(),
+        )
+        connection.close()
+
+    def test_write_error_is_logged_by_writer(self):
+        with patch.object(stats, "console") as console:
+            self.database._execute_write("INSERT INTO no_such_table VALUES (1)")
+            self.database._commit()
+            self.database._wait_for_pending_writes()
+
+        console.print.assert_called_once()
+        self.assertIn("Query: INSERT INTO no_such_table VALUES (1)", console.print.call_args.args[0])
+
+        # The error does not affect unrelated writes that come afterwards.
+        self.database.set_data("written", "1")
+        self.assertEqual(["written"], self._get_base_data_keys())
+
+    def test_database_being_locked_stops_the_bot(self):
+        exception = sqlite3.OperationalError("database is locked")
+        exception.sqlite_errorcode = sqlite3.SQLITE_BUSY
+        with patch.object(stats, "console"), patch.object(self.database, "_write_batches", side_effect=exception):
+            self.database.set_data("lost", "1")
+            self.database._wait_for_pending_writes()
+
+            with self.assertRaises(SystemExit):
+                self.database.set_data("not_accepted", "2")
+
+
+class TestEncounterSummaries(StatsDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        set_character_table()
+        context.config = SimpleNamespace(logging=SimpleNamespace(log_encounters=True))
+        self.database = StatsDatabase(context.profile)
+
+    def _get_encounter_info(self, pokemon: PartyPokemon) -> SimpleNamespace:
+        return SimpleNamespace(
+            pokemon=pokemon,
+            encounter_time=datetime(2024, 1, 1),
+            type=None,
+            map=SimpleNamespace(name="ROUTE_101"),
+            coordinates=(1, 2),
+            bot_mode="Spin",
+            catch_filters_result="Match",
+            battle_outcome=None,
+            is_of_interest=True,
+        )
+
+    def test_end_of_battle_for_unown(self):
+        unown = PartyPokemon(_with_species(zigzagoon, get_species_by_name("Unown").index), 0)
+        self.assertEqual("Unown", unown.species.name)
+        self.assertTrue(unown.is_valid)
+
+        encounter_info = self._get_encounter_info(unown)
+        self.database.log_encounter(encounter_info)
+        self.database.log_end_of_battle(BattleOutcome.Caught, encounter_info)
+
+        # Each Unown letter has its own summary, and the catch must be counted for that one.
+        summary = self.database.get_global_stats().species(unown)
+        self.assertEqual(f"Unown ({unown.unown_letter})", summary.species_name)
+        self.assertEqual(1, summary.total_encounters)
+        self.assertEqual(1, summary.catches)
+        self.assertEqual([unown.species_id_for_stats], list(self.database.get_global_stats().encounter_summaries))
+
+        self.database._wait_for_pending_writes()
+        reloaded_summary = StatsDatabase(context.profile).get_global_stats().species(unown)
+        self.assertEqual(1, reloaded_summary.catches)
+
+    def test_fishing_attempt_with_encounter_is_saved(self):
+        self.database.log_encounter(self._get_encounter_info(PartyPokemon(zigzagoon, 0)))
+        self.database.log_fishing_attempt(FishingAttempt(FishingRod.OldRod, FishingResult.Unsuccessful))
+        global_stats = self.database.get_global_stats()
+
+        # The battle that follows might never be logged (e.g. because the bot is stopped), so the
+        # fishing attempt must be saved on its own.
+        self.database.log_fishing_attempt(FishingAttempt(FishingRod.OldRod, FishingResult.Encounter))
+        self.assertIsNot(global_stats, self.database.get_global_stats())
+
+        self.database._wait_for_pending_writes()
+        shiny_phase = StatsDatabase(context.profile).current_shiny_phase
+        self.assertEqual(2, shiny_phase.fishing_attempts)
+        self.assertEqual(1, shiny_phase.successful_fishing_attempts)
+        self.assertEqual(0, shiny_phase.current_unsuccessful_fishing_streak)
+
+
+if __name__ == "__main__":
+    unittest.main()
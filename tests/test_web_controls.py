@@ -0,0 +1,60 @@
+# Copyright (c) 2026 realgarit
+"""
+Unit tests for modules/web/endpoints/controls.py
+"""
+
+import unittest
+from unittest.mock import MagicMock, call, patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from modules.core.context import context
+from modules.core.main import work_queue
+from modules.web.endpoints.controls import route
+
+
+class TestPostInput(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        while not work_queue.empty():
+            work_queue.get_nowait()
+
+        app = web.Application()
+        app.add_routes(route)
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_unknown_button_is_rejected(self):
+        response = await self.client.post("/input", json=["A", "Turbo"])
+
+        self.assertEqual(422, response.status)
+        self.assertEqual("Unrecognised button: 'Turbo'.", await response.text())
+        self.assertTrue(work_queue.empty())
+
+    async def test_invalid_payload_is_rejected(self):
+        for payload in ({"A": True}, ["A", 1]):
+            with self.subTest(payload=payload):
+                response = await self.client.post("/input", json=payload)
+
+                self.assertEqual(422, response.status)
+                self.assertTrue(work_queue.empty())
+
+    async def test_buttons_are_pressed(self):
+        response = await self.client.post("/input", json=["b", "RIGHT"])
+
+        self.assertEqual(204, response.status)
+        update_inputs = work_queue.get_nowait()
+        self.assertTrue(work_queue.empty())
+
+        emulator = MagicMock()
+        with patch.object(context, "emulator", emulator), patch.object(context, "_current_bot_mode", "Manual"):
+            update_inputs()
+        emulator.reset_held_buttons.assert_called_once()
+        self.assertEqual([call("B"), call("Right")], emulator.hold_button.call_args_list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# Copyright (c) 2026 realgarit
+"""
+Unit tests for modules/web/endpoints/map.py
+"""
+
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import modules.web.endpoints.map
+from modules.core.context import context
+from modules.core.profiles import Profile
+from modules.game.roms import ROM, ROMLanguage
+from modules.web.endpoints.map import route
+
+
+class TestGetMapByGroupAndNumber(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        context.profile = Profile(
+            ROM("", "", "POKEMON EMER", "", ROMLanguage.English, "", 0),
+            Path(self._temporary_directory.name),
+            datetime.now(),
+        )
+
+        # Stand-in for a map with a single trainer, whose event flag lives in the save game.
+        self.trainer = SimpleNamespace(kind="normal", trainer_type="Normal", is_trainer_defeated=False)
+        map_data = SimpleNamespace(
+            objects=[self.trainer],
+            dict_for_map=lambda: {"trainer_is_defeated": self.trainer.is_trainer_defeated},
+            dicts_for_all_tiles=lambda: [],
+        )
+        get_map_data_patch = patch.object(modules.web.endpoints.map, "get_map_data", return_value=map_data)
+        get_map_data_patch.start()
+        self.addCleanup(get_map_data_patch.stop)
+        modules.web.endpoints.map._get_trainer_objects.cache_clear()
+        modules.web.endpoints.map._get_encoded_map.cache_clear()
+
+        app = web.Application()
+        app.add_routes(route)
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        modules.web.endpoints.map._get_trainer_objects.cache_clear()
+        modules.web.endpoints.map._get_encoded_map.cache_clear()
+        self._temporary_directory.cleanup()
+
+    async def test_defeated_trainer_is_not_served_from_cache(self):
+        response = await self.client.get("/map/0/0")
+        self.assertEqual(200, response.status)
+        self.assertFalse((await response.json())["map"]["trainer_is_defeated"])
+        etag = response.headers["ETag"]
+
+        response = await self.client.get("/map/0/0", headers={"If-None-Match": etag})
+        self.assertEqual(304, response.status)
+
+        self.trainer.is_trainer_defeated = True
+        response = await self.client.get("/map/0/0", headers={"If-None-Match": etag})
+        self.assertEqual(200, response.status)
+        self.assertNotEqual(etag, response.headers["ETag"])
+        self.assertTrue((await response.json())["map"]["trainer_is_defeated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
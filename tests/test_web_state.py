@@ -0,0 +1,157 @@
+# Copyright (c) 2026 realgarit
+"""
+Unit tests for modules/web/state.py
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import modules.web.state
+from modules.core.context import context
+from modules.core.main import work_queue
+from modules.web.state import (
+    _failed_updates,
+    _maximum_frames_to_wait_after_failed_update,
+    _pending_updates,
+    _update_batch,
+    _update_via_work_queue,
+    encode_json_with_etag,
+    encoded_json_response,
+)
+
+
+class TestEncodedJsonResponse(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.encoded_data, self.etag = encode_json_with_etag({"map": "ROUTE_101", "tiles": [1, 2, 3]})
+
+        async def http_get_data(request: web.Request):
+            return encoded_json_response(request, self.encoded_data, self.etag)
+
+        app = web.Application()
+        app.add_routes([web.get("/data", http_get_data)])
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_response_without_etag(self):
+        response = await self.client.get("/data")
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(f'"{self.etag}"', response.headers["ETag"])
+        self.assertEqual("no-cache", response.headers["Cache-Control"])
+        self.assertEqual(self.encoded_data, await response.read())
+
+    async def test_matching_etag(self):
+        for if_none_match in (f'"{self.etag}"', f'"something-else", "{self.etag}"'):
+            with self.subTest(if_none_match=if_none_match):
+                response = await self.client.get("/data", headers={"If-None-Match": if_none_match})
+
+                self.assertEqual(304, response.status)
+                self.assertEqual(f'"{self.etag}"', response.headers["ETag"])
+                self.assertEqual(b"", await response.read())
+
+    async def test_outdated_etag(self):
+        response = await self.client.get("/data", headers={"If-None-Match": '"something-else"'})
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(self.encoded_data, await response.read())
+
+    async def test_etag_is_not_computed_per_request(self):
+        with patch.object(modules.web.state.hashlib, "blake2b", wraps=modules.web.state.hashlib.blake2b) as blake2b:
+            await self.client.get("/data")
+            await self.client.get("/data", headers={"If-None-Match": f'"{self.etag}"'})
+
+        blake2b.assert_not_called()
+
+
+class TestUpdateViaWorkQueue(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        _failed_updates.clear()
+        _pending_updates.clear()
+        _update_batch.clear()
+        while not work_queue.empty():
+            work_queue.get_nowait()
+
+        self.frame_count = 0
+        emulator = SimpleNamespace(get_frame_count=lambda: self.frame_count)
+        emulator_patch = patch.object(context, "emulator", emulator)
+        emulator_patch.start()
+        self.addCleanup(emulator_patch.stop)
+
+        # Stand-in for a state cache entry whose data is always outdated.
+        self.state_cache_entry = SimpleNamespace(age_in_frames=100)
+        self.number_of_calls = 0
+
+    def failing_update(self):
+        self.number_of_calls += 1
+        raise RuntimeError("Game is in a weird state.")
+
+    def successful_update(self):
+        self.number_of_calls += 1
+
+    async def request_update(self, frame_count: int, update_callback: callable) -> bool:
+        """
+        Requests an update at the given frame and, if one gets submitted, runs it like the
+        main thread would.
+
+        :return: Whether the update callback has been submitted to the work queue.
+        """
+        self.frame_count = frame_count
+        await _update_via_work_queue(
+            self.state_cache_entry, update_callback, maximum_age_in_frames=1, maximum_stale_age_in_frames=1000
+        )
+        # Lets the event loop submit the batch to the work queue.
+        await asyncio.sleep(0)
+        if work_queue.empty():
+            return False
+
+        work_queue.get_nowait()()
+        # Lets the event loop process the result.
+        await asyncio.sleep(0)
+        return True
+
+    async def test_failed_updates_back_off(self):
+        submitted_at_frames = [
+            frame_count
+            for frame_count in range(100, 400)
+            if await self.request_update(frame_count, self.failing_update)
+        ]
+
+        # Waits 1, 2, 4, 8, 16, 32 frames and from then on 60 frames.
+        self.assertEqual([100, 101, 103, 107, 115, 131, 163, 223, 283, 343], submitted_at_frames)
+        self.assertEqual(len(submitted_at_frames), self.number_of_calls)
+        self.assertEqual(
+            (343, _maximum_frames_to_wait_after_failed_update), _failed_updates[id(self.state_cache_entry)]
+        )
+
+    async def test_back_off_is_reset_after_success(self):
+        for frame_count in (100, 101, 103, 107):
+            self.assertTrue(await self.request_update(frame_count, self.failing_update))
+        self.assertFalse(await self.request_update(114, self.successful_update))
+
+        self.assertTrue(await self.request_update(115, self.successful_update))
+        self.assertNotIn(id(self.state_cache_entry), _failed_updates)
+
+        # After a success, the next failure starts with the shortest wait again.
+        self.assertTrue(await self.request_update(116, self.failing_update))
+        self.assertFalse(await self.request_update(116, self.failing_update))
+        self.assertTrue(await self.request_update(117, self.failing_update))
+
+    async def test_back_off_ends_when_emulator_is_reset(self):
+        for frame_count in (100, 101, 103):
+            self.assertTrue(await self.request_update(frame_count, self.failing_update))
+        self.assertFalse(await self.request_update(104, self.failing_update))
+
+        # The frame count going backwards means the emulator has been reset.
+        self.assertTrue(await self.request_update(10, self.failing_update))
+
+
+if __name__ == "__main__":
+    unittest.main()